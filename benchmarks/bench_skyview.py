@@ -0,0 +1,246 @@
+"""
+Benchmarks for the skyview hot paths.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_skyview --out results.json
+    python -m benchmarks.bench_skyview --quick --filter svf_contour
+
+Each case records the best and median wall time over several repeats and
+the peak memory allocated by one call (measured with tracemalloc). Results
+are written as JSON together with platform and package versions so runs
+can be compared over time.
+"""
+import argparse
+import json
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+from benchmarks import synthetic
+from horizonpy import skyview
+
+BENCHMARKS = []
+
+
+def benchmark(name, quick=None, **sweep):
+    """ Register a benchmark setup function over the cartesian product of ``sweep``
+
+    The setup function is called with one value for every swept parameter
+    and returns a zero-argument callable to be timed. ``quick`` gives the
+    reduced sweep used with --quick.
+    """
+    def decorator(setup):
+        BENCHMARKS.append((name, setup, sweep, quick or {}))
+        return setup
+    return decorator
+
+
+def cases(sweep):
+    keys = list(sweep)
+    for values in np.array(np.meshgrid(*[np.arange(len(sweep[k])) for k in keys],
+                                       indexing='ij')).reshape(len(keys), -1).T:
+        yield {k: sweep[k][i] for (k, i) in zip(keys, values)}
+
+
+@benchmark('rotate_horizon', shape=['fractal_ridge', 'overhanging_cliff'],
+           vertices=[100, 1000, 10000, 100000], quick={'vertices': [100]})
+def bench_rotate_horizon(shape, vertices):
+    azimuth, horizon = synthetic.GENERATORS[shape](vertices)
+    return lambda: skyview.rotate_horizon(azimuth, horizon, 135, 30)
+
+
+@benchmark('svf_orientations', orientations=[10, 1000, 10000],
+           vertices=[360, 3600], quick={'orientations': [10], 'vertices': [360]})
+def bench_svf_orientations(orientations, vertices):
+    azimuth, horizon = synthetic.fractal_ridge(vertices)
+    rng = np.random.default_rng(0)
+    aspect = rng.uniform(0, 360, orientations)
+    dip = rng.uniform(0, 60, orientations)
+    return lambda: skyview.svf_orientations(azimuth, horizon, aspect, dip, 2)
+
+
+@benchmark('test_overhang', shape=['canyon', 'overhanging_cliff', 'dem_like'],
+           vertices=[100, 1000, 5000], quick={'vertices': [100]})
+def bench_test_overhang(shape, vertices):
+    azimuth, horizon = synthetic.GENERATORS[shape](vertices)
+    rt = skyview.rotate_horizon(azimuth, horizon, 120, 60, oob='ignore')
+    return lambda: skyview.test_overhang(rt[0], rt[1])
+
+
+@benchmark('test_obscured', vertices=[360, 10000], increment=[2, 1, 0.25],
+           quick={'vertices': [360], 'increment': [2]})
+def bench_test_obscured(vertices, increment):
+    azimuth, horizon = synthetic.flat(vertices, 70)
+    rt = skyview.rotate_horizon(azimuth, horizon, 120, 120)
+    return lambda: skyview.test_obscured(rt[0], rt[1], increment)
+
+
+@benchmark('svf_helbig_2009', delta_phi=[5, 1, 0.1], quick={'delta_phi': [5]})
+def bench_svf_helbig_2009(delta_phi):
+    azimuth, horizon = synthetic.fractal_ridge(3600)
+    f = lambda x: np.interp(x, azimuth, horizon, period=360)
+    return lambda: skyview.svf_helbig_2009(f, delta_phi)
+
+
+@benchmark('svf_helbig_2009_stack', stations=[1000, 100000], bins=[72, 360],
+           quick={'stations': [1000], 'bins': [72]})
+def bench_svf_helbig_2009_stack(stations, bins):
+    horizons = np.random.default_rng(0).uniform(0, 60, (stations, bins))
+    return lambda: skyview.svf_helbig_2009_stack(horizons)
+
+
+@benchmark('svf_steyn_1980', n=[18, 72], vertices=[360], quick={'n': [18]})
+def bench_svf_steyn_1980(n, vertices):
+    azimuth, horizon = synthetic.fractal_ridge(vertices)
+    return lambda: skyview.svf_steyn_1980(azimuth, horizon, n)
+
+
+@benchmark('svf_steyn_1980_analytic', n=[18, 72, 360], vertices=[360, 10000],
+           quick={'n': [18], 'vertices': [360]})
+def bench_svf_steyn_1980_analytic(n, vertices):
+    azimuth, horizon = synthetic.fractal_ridge(vertices)
+    return lambda: skyview.svf_steyn_1980_analytic(azimuth, horizon, n)
+
+
+@benchmark('SVF_discretized', shape=['fractal_ridge', 'overhanging_cliff'],
+           vertices=[360, 3600], increment=[2, 1],
+           quick={'vertices': [360], 'increment': [2]})
+def bench_svf_discretized(shape, vertices, increment):
+    azimuth, horizon = synthetic.GENERATORS[shape](vertices)
+    return lambda: skyview.SVF_discretized(azimuth, horizon, 130, 35, increment)
+
+
+@benchmark('svf_contour', shape=['fractal_ridge', 'overhanging_cliff', 'dem_like'],
+           vertices=[360, 10000, 100000], quick={'vertices': [360]})
+def bench_svf_contour(shape, vertices):
+    azimuth, horizon = synthetic.GENERATORS[shape](vertices)
+    return lambda: skyview.svf_contour(azimuth, horizon, 130, 35)
+
+
+def measure(func, repeat=5, min_time=0.05):
+    """ Time a callable and measure the peak memory of one call
+
+    Returns
+    -------
+    dict
+        best and median seconds per call, number of calls per repeat and
+        peak traced memory in bytes
+    """
+    func()  # warm up
+
+    # choose the number of calls so that each repeat takes at least min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 2**20:
+            break
+        number *= 2
+
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'best': min(times),
+            'median': statistics.median(times),
+            'number': number,
+            'peak_memory': peak}
+
+
+def run(pattern=None, quick=False, repeat=5, min_time=0.05, verbose=True):
+    """ Run all registered benchmarks whose name matches ``pattern``
+
+    Returns
+    -------
+    list
+        one dict per benchmark case
+    """
+    results = []
+
+    for (name, setup, sweep, quick_sweep) in BENCHMARKS:
+        if pattern and not re.search(pattern, name):
+            continue
+
+        if quick:
+            sweep = dict(sweep, **quick_sweep)
+
+        for params in cases(sweep):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                result = measure(setup(**params), repeat, min_time)
+
+            result.update(name=name, params={k: _plain(v) for (k, v) in params.items()})
+            results.append(result)
+
+            if verbose:
+                print("{:<26} {:<60} {:>12.6f} s {:>10.1f} kB".format(
+                      name, json.dumps(result['params']), result['best'],
+                      result['peak_memory'] / 1024))
+
+    return results
+
+
+def metadata():
+    import horizonpy
+    return {'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'numpy': np.__version__,
+            'horizonpy': horizonpy.__version__,
+            'commit': git_commit()}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark HorizonPy sky view factor calculations",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('--out', type=str, default=None, help="Path to output json file")
+    parser.add_argument('--filter', type=str, default=None, help="Regular expression selecting benchmarks by name")
+    parser.add_argument('--quick', action='store_true', help="Run a reduced sweep")
+    parser.add_argument('--repeat', type=int, default=5, help="Number of timing repeats")
+    parser.add_argument('--min-time', type=float, default=0.05, help="Minimum seconds per timing repeat")
+
+    args = parser.parse_args()
+
+    results = run(args.filter, args.quick, args.repeat, args.min_time)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'metadata': metadata(), 'results': results}, f, indent=2)
+        print("Results written to {}".format(args.out), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Seeded synthetic horizon generators for benchmarking.
+
+Every generator returns ``(azimuth, horizon)`` arrays in degrees with ``n``
+vertices, ordered by azimuth as if digitized around the horizon.
+"""
+import numpy as np
+
+
+def flat(n, elevation=0., seed=None):
+    """ Constant horizon angle """
+    azimuth = np.linspace(0, 360, n, endpoint=False)
+    return azimuth, np.full(n, float(elevation))
+
+
+def canyon(n, depth=60., orientation=0., seed=None):
+    """ Steep walls on either side of a canyon running towards ``orientation`` """
+    azimuth = np.linspace(0, 360, n, endpoint=False)
+    horizon = depth * np.abs(np.sin(np.radians(azimuth - orientation))) ** 0.5
+    return azimuth, horizon
+
+
+def fractal_ridge(n, seed=0, mean=15., amplitude=10., hurst=0.7, octaves=64):
+    """ Periodic fractal (1/f) ridge line built by spectral synthesis """
+    rng = np.random.default_rng(seed)
+    azimuth = np.linspace(0, 360, n, endpoint=False)
+
+    k = np.arange(1, octaves + 1)[:, np.newaxis]
+    weights = k ** -(hurst + 0.5)
+    phases = rng.uniform(0, 2 * np.pi, k.shape)
+    signal = np.sum(weights * np.sin(k * np.radians(azimuth) + phases), axis=0)
+
+    horizon = mean + amplitude * signal / np.max(np.abs(signal))
+    return azimuth, np.clip(horizon, 0, 89)
+
+
+def overhanging_cliff(n, seed=0, height=110., width=60., direction=180.):
+    """ Fractal ridge with a cliff whose top overhangs the observer (> 90 degrees) """
+    azimuth, horizon = fractal_ridge(n, seed)
+    offset = (azimuth - direction + 180) % 360 - 180
+    cliff = np.abs(offset) < width / 2
+    horizon[cliff] = height - 20 * (2 * offset[cliff] / width) ** 2
+    return azimuth, horizon
+
+
+def dem_like(n, seed=0):
+    """ Dense, rough horizon such as one traced from a DEM (10k-100k vertices) """
+    rng = np.random.default_rng(seed)
+    azimuth, horizon = fractal_ridge(n, seed, octaves=512, hurst=0.5)
+    horizon = horizon + rng.normal(0, 0.5, n)
+    return azimuth, np.clip(horizon, 0, 89)
+
+
+GENERATORS = {'flat': flat,
+              'canyon': canyon,
+              'fractal_ridge': fractal_ridge,
+              'overhanging_cliff': overhanging_cliff,
+              'dem_like': dem_like}
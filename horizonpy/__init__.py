@@ -1,7 +1,26 @@
-import pkg_resources
+import os
 
-try:
-    fname = pkg_resources.resource_filename('horizonpy', "VERSION")
-    __version__ = open('horizonpy/VERSION').read().strip()
-except Exception:
-    __version__ = "???"
+
+def __getattr__(name):
+    # the version is looked up on first access because importing
+    # importlib.metadata costs more than the rest of the package import
+    if name == '__version__':
+        global __version__
+        __version__ = _get_version()
+        return __version__
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def _get_version():
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+        return version('horizonpy')
+    except (ImportError, PackageNotFoundError):  # not installed, e.g. running from a source checkout
+        pass
+
+    try:
+        with open(os.path.join(os.path.dirname(__file__), "VERSION")) as f:
+            return f.read().strip()
+    except OSError:
+        return "???"
@@ -1,7 +1,13 @@
 try:
-    import gdal
-    import ogr
+    from osgeo import gdal, ogr
 except ImportError:
+    try:
+        import gdal
+        import ogr
+    except ImportError:
+        gdal = ogr = None
+
+if gdal is None:
     import warnings
     warnings.warn("Could not import gdal / ogr", ImportWarning)
     _has_gdal = False
@@ -12,26 +18,454 @@ else:
 import re
 import os
 import sys
+import glob
+import hashlib
+import tempfile
+import logging
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
 
 import numpy as np
-from math import atan2, sqrt
 from pandas import DataFrame
-from scipy.interpolate import interp1d
+
+from horizonpy.horizon import Horizon
+from horizonpy.profiling import timed
+from horizonpy.skyview import svf_helbig_2009
+
+
+BACKENDS = ['gdal', 'numpy']
+SCAN_MODES = ['outer', 'inner']
+RASTER_EXTENSIONS = ['.tif', '.tiff', '.img', '.png']
+SUMMARY_COLUMNS = ['raster', 'output', 'points', 'min_horizon', 'mean_horizon',
+                   'max_horizon', 'svf', 'error']
+
+
+def read_raster(raster_file):
+    """ Read the first band of a raster file into a 2-d numpy array
+
+    Uses tifffile if it is installed, otherwise Pillow.
+    """
+    try:
+        import tifffile
+    except ImportError:
+        tifffile = None
+
+    if tifffile is not None and re.search("\\.tiff?$", raster_file, re.IGNORECASE):
+        with tifffile.TiffFile(raster_file) as tif:
+            series = tif.series[0]
+            data, axes = series.asarray(), series.axes
+    else:
+        from PIL import Image
+        with Image.open(raster_file) as img:
+            data, axes = np.array(img), None
+
+    return next(_split_bands(data, axes))
+
+
+def read_geotransform(raster_file):
+    """ Geotransform of a raster file in GDAL order
+
+    Uses GDAL if it is available, otherwise the GeoTIFF tags (model
+    tiepoint and pixel scale, or model transformation) read with tifffile or
+    Pillow.
+
+    Returns
+    -------
+    tuple
+        (x0, dx, rx, y0, ry, dy), so that x = x0 + col * dx + row * rx and
+        y = y0 + col * ry + row * dy. Rasters without georeferencing have
+        the identity transform (0, 1, 0, 0, 0, 1), as in GDAL.
+    """
+    if _has_gdal:
+        return tuple(gdal.Open(raster_file).GetGeoTransform())
+
+    tags = dict()
+
+    try:
+        import tifffile
+    except ImportError:
+        tifffile = None
+
+    if tifffile is not None and re.search("\\.tiff?$", raster_file, re.IGNORECASE):
+        with tifffile.TiffFile(raster_file) as tif:
+            tags = {tag.code: tag.value for tag in tif.pages[0].tags.values()}
+    else:
+        from PIL import Image
+        with Image.open(raster_file) as img:
+            tags = dict(getattr(img, 'tag_v2', None) or {})
+
+    if 34264 in tags:  # ModelTransformationTag, 4 x 4 matrix
+        M = tags[34264]
+        return (M[3], M[0], M[1], M[7], M[4], M[5])
+
+    if 33922 in tags and 33550 in tags:  # ModelTiepointTag and ModelPixelScaleTag
+        i, j, _, X, Y, _ = tags[33922][:6]
+        sx, sy = tags[33550][:2]
+        return (X - i * sx, sx, 0., Y + j * sy, 0., -sy)
+
+    return (0., 1., 0., 0., 0., 1.)
+
+
+def radial_scan(sky, n_azimuth=1440, mode='outer', step=0.5):
+    """ Find the distance from the centre to the horizon along radial lines
+
+    Parameters
+    ----------
+    sky : array_like
+        2-d boolean array, True for sky pixels
+    n_azimuth : int
+        number of evenly spaced radial lines
+    mode : str
+        'outer' finds the farthest sky pixel along each line, so that holes
+        in the sky (e.g. wires or branches) and sky patches separated from
+        the zenith are treated as sky. 'inner' finds the first non-sky pixel
+        from the centre, so that any obstruction is part of the horizon.
+    step : float
+        sampling interval along each line in pixels
+
+    Returns
+    -------
+    tuple
+        (angle, R, Rmax): angle of each line in degrees (as
+        ``atan2(row - y0, col - x0)``), distance from the centre to the
+        horizon in pixels, and radius of the image
+
+    Examples
+    --------
+    >>> yy, xx = np.mgrid[0:101, 0:101]
+    >>> sky = (xx - 50) ** 2 + (yy - 50) ** 2 < 25 ** 2  # distances of pixel centres
+    >>> angle, R, Rmax = radial_scan(sky, n_azimuth=4)
+    >>> angle, R, Rmax
+    (array([  0.,  90., 180., 270.]), array([24.5, 24.5, 24.5, 24.5]), 50.5)
+    """
+    if mode not in SCAN_MODES:
+        raise ValueError("mode must be one of {}".format(SCAN_MODES))
+
+    sky = np.asarray(sky, dtype=bool)
+    rows, cols = sky.shape
+    x0, y0 = cols / 2, rows / 2
+    Rmax = x0  # equal to N/2 because centroid is halfway to other side
+
+    angle = np.arange(n_azimuth) * (360. / n_azimuth)
+    r = np.arange(0, Rmax, step) + step / 2
+
+    # pixel indices of every sample on every line: (n_azimuth, n_samples)
+    a = np.radians(angle)[:, np.newaxis]
+    ix = np.floor(x0 + r * np.cos(a)).astype(np.intp)
+    iy = np.floor(y0 + r * np.sin(a)).astype(np.intp)
+    inside = (ix >= 0) & (ix < cols) & (iy >= 0) & (iy < rows)
+    is_sky = np.zeros(ix.shape, dtype=bool)
+    is_sky[inside] = sky[iy[inside], ix[inside]]
+
+    if mode == 'outer':
+        any_sky = is_sky.any(axis=1)
+        last = r.size - 1 - np.argmax(is_sky[:, ::-1], axis=1)
+        R = np.where(any_sky, r[last] + step / 2, 0)
+
+    else:
+        all_sky = is_sky.all(axis=1)
+        first = np.argmax(~is_sky, axis=1)
+        R = np.where(all_sky, Rmax, r[first] - step / 2)
+
+    return angle, R, Rmax
+
+
+def horizon_from_array(data, sky_value=1, n_azimuth=1440, scan_mode='outer', geotransform=None):
+    """ Horizon from a classified skymap array by radial scans
+
+    Parameters
+    ----------
+    geotransform : tuple, optional
+        geotransform of the raster (see :func:`read_geotransform`). Azimuths
+        are measured in its coordinate system, as on the polygonize path,
+        e.g. counterclockwise from the column axis for north-up rasters.
+        Rotation terms are ignored. By default, azimuths are measured from
+        the column axis towards the row axis.
+
+    Returns
+    -------
+    tuple
+        (azimuth, horizon, R): azimuth and horizon arrays in degrees, and the
+        distance from the centre to the horizon in pixels
+    """
+    angle, R, Rmax = radial_scan(np.asarray(data) == sky_value, n_azimuth, scan_mode)
+    theta_h = 90 * (1 - R / Rmax)  # see ArcSky.get_angle
+
+    if geotransform is not None:
+        a = np.radians(angle)
+        angle = np.degrees(np.arctan2(geotransform[5] * np.sin(a),
+                                      geotransform[1] * np.cos(a))) % 360
+
+    return angle, theta_h, R
+
+
+def iter_bands(raster_file):
+    """ Iterate lazily over the bands of a raster file
+
+    Only one band is held in memory at a time where the file format allows:
+    GDAL reads bands individually, and uncompressed TIFF files are memory
+    mapped with tifffile. Otherwise pages (or frames) are read one at a
+    time with tifffile or Pillow.
+
+    Yields
+    ------
+    tuple
+        (band number starting at 1, band description or None, 2-d array)
+    """
+    if _has_gdal:
+        ds = gdal.Open(raster_file)
+        for i in range(1, ds.RasterCount + 1):
+            band = ds.GetRasterBand(i)
+            yield i, band.GetDescription() or None, band.ReadAsArray()
+        return
+
+    try:
+        import tifffile
+    except ImportError:
+        tifffile = None
+
+    if tifffile is not None and re.search("\\.tiff?$", raster_file, re.IGNORECASE):
+        with tifffile.TiffFile(raster_file) as tif:
+            axes = tif.series[0].axes
+
+        try:
+            data = tifffile.memmap(raster_file, mode='r')
+        except ValueError:  # compressed or not contiguous
+            data = None
+
+        if data is not None:
+            for i, band in enumerate(_split_bands(data, axes), start=1):
+                yield i, None, np.array(band)
+            return
+
+        with tifffile.TiffFile(raster_file) as tif:
+            i = 0
+            for page in tif.pages:
+                for band in _split_bands(page.asarray(), page.axes):
+                    i += 1
+                    yield i, None, band
+        return
+
+    from PIL import Image, ImageSequence
+    with Image.open(raster_file) as img:
+        i = 0
+        for frame in ImageSequence.Iterator(img):
+            for band in _split_bands(np.array(frame)):
+                i += 1
+                yield i, None, band
+
+
+def _split_bands(data, axes=None):
+    """ yield the 2-d bands of an array in file order
+
+    ``axes`` labels the dimensions of ``data`` as in tifffile, e.g. 'YX',
+    'YXS' (interleaved samples), 'SYX' (planar samples) or 'IYX' (pages).
+    The default is Pillow's layout: 'YX', or 'YXS' for multi-band images.
+    """
+    if axes is None:
+        axes = 'YXS'[:data.ndim]
+
+    data = np.moveaxis(data, (axes.index('Y'), axes.index('X')), (-2, -1))
+    for index in np.ndindex(data.shape[:-2]):
+        yield data[index]
+
+
+def iter_horizons(inputs, sky_value=1, n_azimuth=1440, scan_mode='outer'):
+    """ Stream horizons from skymap files and multi-band stacks
+
+    Files and bands are read lazily so that memory use does not depend on
+    the number of stations. Horizons are found with :func:`radial_scan`.
+
+    Parameters
+    ----------
+    inputs : list
+        raster files, directories or glob patterns
+    sky_value : int
+        value of the sky class
+    n_azimuth : int
+        number of radial lines
+    scan_mode : str
+        'outer' or 'inner', see :func:`radial_scan`
+
+    Yields
+    ------
+    tuple
+        (station identifier, Horizon). The identifier is the band
+        description if there is one, otherwise the file name, followed by
+        the band number for multi-band files.
+    """
+    for raster_file in find_rasters(inputs):
+        name = os.path.splitext(os.path.basename(raster_file))[0]
+        geotransform = read_geotransform(raster_file)
+        bands = iter_bands(raster_file)
+
+        # look ahead one band to find out whether to number stations
+        head = list(islice(bands, 2))
+        multiband = len(head) > 1
+
+        for (i, description, data) in chain(head, bands):
+            station = description or ("{}_{}".format(name, i) if multiband else name)
+            phi, theta_h, _ = horizon_from_array(data, sky_value, n_azimuth, scan_mode,
+                                                 geotransform)
+            yield station, Horizon(phi, theta_h)
+
+
+class HorizonCache(object):
+    """
+    Directory cache of horizons extracted from skymap rasters.
+
+    Entries are .npz files named by a hash of the raster path, modification
+    time, size and content, and of the settings that affect the result
+    (sky class value, backend, scan mode and number of azimuths). Changed
+    rasters therefore get new entries and are converted again.
+
+    Parameters
+    ----------
+    directory : str
+        cache directory. It is created if it does not exist.
+    """
+    SUFFIX = ".horizon.npz"
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(raster_file, **settings):
+        """ Hash a raster file and conversion settings into a cache key """
+        st = os.stat(raster_file)
+
+        h = hashlib.sha256()
+        h.update(os.path.abspath(raster_file).encode())
+        h.update("{}:{}".format(st.st_mtime_ns, st.st_size).encode())
+        h.update(repr(sorted(settings.items())).encode())
+
+        with open(raster_file, 'rb') as f:
+            for block in iter(lambda: f.read(2**20), b""):
+                h.update(block)
+
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key):
+        """ Return a dict with 'azimuth', 'horizon', 'centroid' and 'raw_points', or None """
+        try:
+            with np.load(self._path(key)) as data:
+                return {k: data[k] for k in data.files}
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, azimuth, horizon, centroid, raw_points):
+        """ Store an extracted horizon """
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, azimuth=azimuth, horizon=horizon,
+                     centroid=np.asarray(centroid, dtype=float),
+                     raw_points=np.asarray(raw_points, dtype=float).reshape(-1, 2))
+        os.replace(tmp, self._path(key))  # atomic, so parallel workers never read partial files
+
+    def clear(self):
+        """ Remove all cache entries """
+        for f in glob.glob(os.path.join(self.directory, "*" + self.SUFFIX)):
+            os.remove(f)
+
+    def __len__(self):
+        return len(glob.glob(os.path.join(self.directory, "*" + self.SUFFIX)))
+
+
+@lru_cache(maxsize=16)
+def pixel_weights(shape):
+    """ Sky view factor contribution of each pixel of a skymap raster
+
+    ArcGIS skymaps use an equiangular projection, with zenith angle
+    z = 90 * r / Rmax at distance r from the centre. A pixel of unit area
+    covers a solid angle of sin(z) (dz/dr) / r, which is weighted by cos(z)
+    for a horizontal surface. sin(z) / r is evaluated with ``np.sinc`` so
+    that the centre pixel is finite. Weights are normalized to sum to 1 and
+    cached for each raster shape.
+
+    Parameters
+    ----------
+    shape : tuple
+        (rows, cols) of the raster
+
+    Returns
+    -------
+    array
+        read-only (rows, cols) array of weights, 0 outside the skymap circle
+
+    Examples
+    --------
+    >>> w = pixel_weights((101, 101))
+    >>> round(float(w.sum()), 6), float(w[0, 0])
+    (1.0, 0.0)
+    """
+    rows, cols = shape
+    x0, y0 = cols / 2, rows / 2
+    Rmax = x0
+
+    yy, xx = np.mgrid[0:rows, 0:cols] + 0.5
+    r = np.hypot(xx - x0, yy - y0)
+    z = (np.pi / 2) * r / Rmax
+
+    # cos(z) sin(z) / r * dz/dr, with sin(z) / r = (dz/dr) sinc(z / pi)
+    dzdr = (np.pi / 2) / Rmax
+    w = np.where(r < Rmax, np.cos(z) * np.sinc(z / np.pi) * dzdr ** 2, 0)
+    w = w / w.sum()
+    w.flags.writeable = False
+
+    return w
 
 
 class ArcSky(object):
     """
     Class to convert arcsky horizon maps from raster files into (azimuth, horizon)
     pairs and write values to a csv.
+
+    Parameters
+    ----------
+    raster_file : str, optional
+        skymap raster to open
+    vector_file : str, optional
+        shapefile to write sky polygons to for debugging ('gdal' backend only)
+    backend : str, optional
+        'gdal' polygonizes the raster and uses the outline of the sky
+        polygon. 'numpy' reads the raster as an array and scans radial lines
+        from the centre, without GDAL. Defaults to 'gdal' if it is
+        installed, otherwise 'numpy'.
+    scan_mode : str
+        'outer' or 'inner', see :func:`radial_scan` ('numpy' backend only)
+    n_azimuth : int
+        number of radial lines ('numpy' backend only)
+    cache_dir : str, optional
+        directory of a :class:`HorizonCache`. If given, horizons of
+        unchanged rasters are loaded from the cache instead of extracted.
     """
     SKY_CLASS_VALUE = 1 # default is: 1 = sky, -1 = ground, -3 = nodata
 
-    def __init__(self, raster_file=None):
+    def __init__(self, raster_file=None, vector_file=None, backend=None,
+                 scan_mode='outer', n_azimuth=1440, cache_dir=None):
+        if backend is None:
+            backend = 'gdal' if _has_gdal else 'numpy'
+
+        if backend not in BACKENDS:
+            raise ValueError("backend must be one of {}".format(BACKENDS))
+
+        self.backend = backend
+        self.scan_mode = scan_mode
+        self.n_azimuth = n_azimuth
         self.raster = raster_file
         self.raw_points = None
         self.centroid = None
-        self.vector_file = None
+        self.vector_file = vector_file
+        self.horizon = None
+        self._profile = None
+        self._vector_ds = None
+        self.cache = HorizonCache(cache_dir) if cache_dir else None
         if self.raster is not None:
             self.open_new_file(self.raster)
 
@@ -39,63 +473,95 @@ class ArcSky(object):
         """ set the value for the sky region in the input raster """
         self.SKY_CLASS_VALUE = value
 
-    def __clean_shapefile(self):
-        if not self.vector:
-            return
-        clean = [self.vector]
-        clean.append(re.sub("shp$", "shx", self.vector))
-        clean.append(re.sub("shp$", "dbf", self.vector))
-
-        for tmpfile in clean:
-            if os.path.isfile(tmpfile):
-                os.remove(tmpfile)
-
+    @timed('arcsky.polygonize')
     def polygonize(self, vector_file=None):
-        """ convert raster file to shapefile """
+        """ convert raster file to polygons
+
+        Polygons are kept in an in-memory OGR datasource. If ``vector_file``
+        (or ``self.vector_file``) is given, they are also written to that
+        shapefile, which is useful for debugging.
+        """
+        vector_file = vector_file or self.vector_file
 
         # Open raster file
         rast = gdal.Open(self.raster)
         srcband = rast.GetRasterBand(1)
 
-        # rename raster filename if no vector filename provided
-        if vector_file is None:
-            vector_file = re.sub("\\.[^.]*$", ".shp", self.raster)
+        # create vector datasource
+        if vector_file:
+            drv = ogr.GetDriverByName("ESRI Shapefile")
+
+            # overwrite polygons of a previous conversion
+            if os.path.exists(vector_file):
+                self._vector_ds = None
+                drv.DeleteDataSource(vector_file)
 
-        # create vector shapefile
-        drv = ogr.GetDriverByName("ESRI Shapefile")
-        dst_ds = drv.CreateDataSource(vector_file)
+            dst_ds = drv.CreateDataSource(vector_file)
+            layer_name = re.sub("\\.shp$", "", os.path.basename(vector_file))
+        else:
+            drv = ogr.GetDriverByName("Memory") or ogr.GetDriverByName("MEM")
+            dst_ds = drv.CreateDataSource("arcsky")
+            layer_name = "sky"
 
-        dst_layer = dst_ds.CreateLayer(re.sub("\\.shp$", "", vector_file), srs = None)
+        dst_layer = dst_ds.CreateLayer(layer_name, srs = None)
 
         newField = ogr.FieldDefn('view', ogr.OFTInteger)
         dst_layer.CreateField(newField)
 
         result = gdal.Polygonize(srcband, None, dst_layer, 0, [], callback=None)
 
-        # store shapefile info so it can be cleaned later
-        self.vector = vector_file
+        if result != 0:
+            return False
 
-        # close and write to file
-        if result == 0:
-            dst_ds = None
+        if vector_file:
+            dst_ds.FlushCache()
             self.vector_file = vector_file
-            return True
 
-        return False
+        # keep datasource open for extract_coordinates
+        self._vector_ds = dst_ds
+        return True
 
     def open_new_file(self, file):
         self.raster = file
+
+        if self.cache is None:
+            return self._convert()
+
+        key = self.cache.make_key(file, sky=self.SKY_CLASS_VALUE, backend=self.backend,
+                                  scan_mode=self.scan_mode, n_azimuth=self.n_azimuth)
+        entry = self.cache.get(key)
+
+        if entry is not None:
+            self.centroid = tuple(entry['centroid'])
+            self.raw_points = [tuple(p) for p in entry['raw_points']]
+            self._set_horizon(entry['azimuth'], entry['horizon'])
+            return True
+
+        if not self._convert():
+            return False
+
+        self.cache.put(key, self.horizon[0].to_numpy(), self.horizon[1].to_numpy(),
+                       self.centroid, self.raw_points)
+        return True
+
+    def _convert(self):
+        """ extract horizon from the current raster with the selected backend """
+        if self.backend == 'numpy':
+            return self.scan_horizon()
+
         P = self.polygonize()
         E = self.extract_coordinates()
         C = self.calculate_horizon()
 
-        self.__clean_shapefile()
+        # release polygons once the horizon has been calculated
+        self._vector_ds = None
 
         if (P and E and C):
             return True
 
         return False
 
+    @timed('arcsky.extract_coordinates')
     def extract_coordinates(self):
         '''
         get centroid and horizon coordinates from raster by polygonizing
@@ -104,13 +570,15 @@ class ArcSky(object):
         self.centroid   = None
         self.raw_points = None
 
-        if not self.vector_file:
-            if not self.polygonize():
-                exit(1)
+        if self._vector_ds is not None:
+            dataSource = self._vector_ds
+        elif self.vector_file and os.path.isfile(self.vector_file):
+            dataSource = ogr.GetDriverByName("ESRI Shapefile").Open(self.vector_file, 0)
+        elif self.polygonize():
+            dataSource = self._vector_ds
+        else:
+            exit(1)
 
-        # open file
-        driver = ogr.GetDriverByName("ESRI Shapefile")
-        dataSource = driver.Open(self.vector_file, 0)
         layer = dataSource.GetLayer()
 
         # get centroid
@@ -134,9 +602,6 @@ class ArcSky(object):
 
         self.raw_points = points
 
-        # close points
-        dataSource = None
-
         if self.raw_points and self.centroid:
             return True
 
@@ -158,6 +623,7 @@ class ArcSky(object):
 
         return(theta_h)
 
+    @timed('arcsky.calculate_horizon')
     def calculate_horizon(self):
         """ calculate horizon coordinates from raster (x,y) horizon outline  """
         if not (self.centroid and self.raw_points):
@@ -169,51 +635,291 @@ class ArcSky(object):
         x0   = self.centroid[0]
         y0   = self.centroid[1]
 
+        points = np.asarray(self.raw_points, dtype=float)
+        dx = points[:, 0] - x0
+        dy = points[:, 1] - y0
+
         # calculate azimuth angles
-        phi = [np.degrees(atan2(y - y0, x - x0)) for (x, y) in self.raw_points]
-        phi = [x % 360 for x in phi]
+        phi = np.degrees(np.arctan2(dy, dx)) % 360
 
         # calculate horizon angle from skyview radius
-        R = [sqrt( (y - y0) ** 2 + (x - x0) ** 2) for (x, y) in self.raw_points]
-        theta_h = [self.get_angle(r, Rmax) for r in R]
+        theta_h = self.get_angle(np.hypot(dx, dy), Rmax)
 
-        # save as dataframe
-        self.horizon = DataFrame(list(zip(phi, theta_h)))
+        self._set_horizon(phi, theta_h)
 
         return True
 
+    def _set_horizon(self, phi, theta_h):
+        """ store horizon as a dataframe and a sorted Horizon profile """
+        self.horizon = DataFrame({0: phi, 1: theta_h})
+        self._profile = Horizon(phi, theta_h)
+
+    @timed('arcsky.scan_horizon')
+    def scan_horizon(self):
+        """ calculate horizon from the raster array by radial scans (no GDAL)
+
+        Also sets ``centroid`` and ``raw_points`` (the horizon outline) in
+        the coordinates of the raster's geotransform, as the polygonize
+        path does, so that azimuths agree between the two backends.
+        """
+        data = read_raster(self.raster)
+        gt = read_geotransform(self.raster)
+
+        angle, theta_h, R = horizon_from_array(data, self.SKY_CLASS_VALUE,
+                                               self.n_azimuth, self.scan_mode, gt)
+
+        rows, cols = data.shape
+        x0, y0 = gt[0] + gt[1] * cols / 2, gt[3] + gt[5] * rows / 2
+        a = np.radians(angle)
+        self.centroid = (x0, y0)
+        self.raw_points = list(zip(x0 + abs(gt[1]) * R * np.cos(a),
+                                   y0 + abs(gt[5]) * R * np.sin(a)))
+
+        self._set_horizon(angle, theta_h)
+
+        return True
+
+    def sky_view_factor(self, raster_file=None):
+        """ calculate sky view factor directly from the classified raster
+
+        Sky pixels are summed with the weights from :func:`pixel_weights`,
+        without extracting a horizon line. Holes and separate sky patches are
+        included exactly as classified.
+
+        Parameters
+        ----------
+        raster_file : str, optional
+            skymap raster. Defaults to the currently open raster.
+
+        Returns
+        -------
+        float
+            Sky view factor between 0 and 1 for a horizontal surface
+        """
+        data = read_raster(raster_file or self.raster)
+        w = pixel_weights(data.shape)
+        sky = (data == self.SKY_CLASS_VALUE)
+
+        return float(np.dot(w.ravel(), sky.ravel()))
+
+    @property
+    def profile(self):
+        """ horizon as a :class:`~horizonpy.horizon.Horizon`, or None """
+        if self.horizon is None or isinstance(self.horizon, Horizon):
+            return self.horizon
+
+        if self._profile is None:
+            self._profile = Horizon(self.horizon[0], self.horizon[1])
+
+        return self._profile
+
+    def has_horizon(self):
+        """ whether horizon data has been calculated or set """
+        return self.horizon is not None and len(self.horizon) > 0
+
     def interpolate_horizon(self, delta_phi):
-        """ interpolate horizon to evenly-stepped azimuth values"""
-        if not any(self.horizon):
+        """ interpolate horizon to evenly-stepped azimuth values
+
+        Parameters
+        ----------
+        delta_phi : float or list
+            azimuth spacing in degrees, or a list of spacings
+
+        Returns
+        -------
+        DataFrame or dict
+            a DataFrame of azimuth and horizon, or for a list of spacings, a
+            dict of DataFrames keyed by spacing. All resolutions are
+            interpolated from the same sorted horizon.
+        """
+        if not self.has_horizon():
             print('no horizon data')
             return
 
-        # sort horizon coordinates by azimuth angle
-        az = self.horizon[0][np.argsort(self.horizon[0])]
-        hor = self.horizon[1][np.argsort(self.horizon[0])]
-
-        # add endpoints on either side of sequence so interpolation is good
-        x = np.concatenate((az[-2: ] - 360, az, az[: 2] + 360))
-        y = np.concatenate((hor[-2: ], hor, hor[: 2]))
+        if np.ndim(delta_phi) > 0:
+            return {d: self.interpolate_horizon(d) for d in delta_phi}
 
         # create evenly spaced horizon points using interpolation
-        f_hor = interp1d(x, y, kind = 'linear')
-        phi = np.array(range(0, 360, delta_phi))
-        theta_h = f_hor(phi)
+        phi, theta_h = self.profile.resample(delta_phi)
 
-        return(DataFrame(list(zip(phi, theta_h)), columns=['azimuth_deg', 'horizon_ele_deg']))
+        return(DataFrame({'azimuth_deg': phi, 'horizon_ele_deg': theta_h}))
 
     def write_horizon_file(self, output_file, delta_phi=2):
-        """ write interpolated horizon data to a geotop horizon file """
+        """ write interpolated horizon data to a geotop horizon file
+
+        If ``delta_phi`` is a list, one file is written per spacing, named
+        with :func:`horizon_file_name`.
+
+        Returns
+        -------
+        list
+            paths of the files written
+        """
 
-        if not any(self.horizon):
+        if not self.has_horizon():
             print('no horizon data')
             return
 
-        hr_intrp = self.interpolate_horizon(delta_phi)
-        hr_intrp = np.round(hr_intrp, 1)
-        hr_intrp.to_csv(output_file, index = False)
-        print("Horizon written to {}".format(output_file))
+        if np.ndim(delta_phi) == 0:
+            files = {delta_phi: output_file}
+        else:
+            files = {d: horizon_file_name(output_file, d) for d in delta_phi}
+
+        for (delta, hr_intrp) in self.interpolate_horizon(list(files)).items():
+            hr_intrp = np.round(hr_intrp, 1)
+            hr_intrp.to_csv(files[delta], index = False)
+            print("Horizon written to {}".format(files[delta]))
+
+        return list(files.values())
+
+
+def horizon_file_name(output_file, delta_phi):
+    """ Add the azimuth spacing to a horizon file name
+
+    Examples
+    --------
+    >>> horizon_file_name("station/horizon.csv", 2)
+    'station/horizon_2deg.csv'
+    >>> horizon_file_name("horizon.csv", 0.5)
+    'horizon_0.5deg.csv'
+    """
+    root, ext = os.path.splitext(output_file)
+    return "{}_{:g}deg{}".format(root, delta_phi, ext)
+
+
+def find_rasters(inputs):
+    """ Expand directories and glob patterns into a sorted list of raster files """
+    files = set()
+
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            files.update(f for f in glob.glob(os.path.join(pattern, "*"))
+                         if os.path.splitext(f)[1].lower() in RASTER_EXTENSIONS)
+        else:
+            files.update(glob.glob(pattern))
+
+    return sorted(files)
+
+
+def init_worker():
+    """ Configure GDAL once per worker process """
+    if _has_gdal:
+        gdal.UseExceptions()
+        ogr.UseExceptions()
+
+
+def convert_raster(raster_file, output_file=None, sky_value=1, delta_phi=2,
+                   backend=None, scan_mode='outer', svf_only=False, cache_dir=None):
+    """ Convert one skymap raster to a horizon file
+
+    Errors are caught so that one bad raster does not stop a batch. If
+    ``svf_only`` is True, no horizon file is written and sky view factor is
+    calculated directly from the raster pixels.
+
+    Returns
+    -------
+    dict
+        summary of the horizon and sky view factor, with an 'error' message
+        if the raster could not be converted
+    """
+    if output_file is None:
+        output_file = re.sub("\\.[^.]*$", ".csv", raster_file)
+
+    summary = dict.fromkeys(SUMMARY_COLUMNS)
+    summary.update(raster=raster_file, output=output_file)
+
+    try:
+        AS = ArcSky(backend=backend, scan_mode=scan_mode, cache_dir=cache_dir)
+        AS.setSkyClassValue(sky_value)
+
+        if svf_only:
+            summary.update(output=None, svf=AS.sky_view_factor(raster_file))
+            return summary
+
+        if not AS.open_new_file(raster_file) or not AS.has_horizon():
+            raise ValueError("no horizon found")
+
+        AS.write_horizon_file(output_file, delta_phi)
+
+        H = AS.profile
+        delta_phi = np.min(delta_phi)
+        summary.update(points=len(H),
+                       min_horizon=float(np.min(H.horizon)),
+                       mean_horizon=float(np.mean(H.horizon)),
+                       max_horizon=float(np.max(H.horizon)),
+                       svf=float(svf_helbig_2009(H, delta_phi)))
+
+    except (Exception, SystemExit) as e:  # extract_coordinates calls exit() on failure
+        logging.error("Could not convert {}: {}".format(raster_file, e))
+        summary['error'] = str(e) or type(e).__name__
+
+    return summary
+
+
+def convert_rasters(raster_files, out_dir=None, jobs=1, **kwargs):
+    """ Convert many skymap rasters, optionally in parallel
+
+    Parameters
+    ----------
+    raster_files : list
+        paths to skymap rasters
+    out_dir : str, optional
+        directory for horizon files. Defaults to next to each raster.
+    jobs : int
+        number of worker processes
+    kwargs :
+        passed to :func:`convert_raster`
+
+    Returns
+    -------
+    DataFrame
+        one summary row per raster, in input order
+    """
+    outputs = [None] * len(raster_files)
+
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        outputs = [os.path.join(out_dir, re.sub("\\.[^.]*$", ".csv", os.path.basename(f)))
+                   for f in raster_files]
+
+    if jobs <= 1:
+        init_worker()
+        rows = [convert_raster(f, o, **kwargs) for (f, o) in zip(raster_files, outputs)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker) as executor:
+            futures = [executor.submit(convert_raster, f, o, **kwargs)
+                       for (f, o) in zip(raster_files, outputs)]
+            rows = [f.result() for f in futures]
+
+    return DataFrame(rows, columns=SUMMARY_COLUMNS).astype({'points': 'Int64'})
+
+
+def convert_bands(inputs, out_dir, sky_value=1, scan_mode='outer', delta_phi=2):
+    """ Write a horizon file for every band of every raster, streaming bands
+
+    Returns
+    -------
+    DataFrame
+        one summary row per station
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rows = []
+    AS = ArcSky(backend='numpy')
+
+    for (station, H) in iter_horizons(inputs, sky_value, scan_mode=scan_mode):
+        AS._set_horizon(H.azimuth, H.horizon)
+        output = AS.write_horizon_file(os.path.join(out_dir, station + ".csv"), delta_phi)
+
+        rows.append({'raster': station,
+                     'output': output[0] if len(output) == 1 else ";".join(output),
+                     'points': len(H),
+                     'min_horizon': float(np.min(H.horizon)),
+                     'mean_horizon': float(np.mean(H.horizon)),
+                     'max_horizon': float(np.max(H.horizon)),
+                     'svf': float(svf_helbig_2009(H, np.min(delta_phi))),
+                     'error': None})
+
+    return DataFrame(rows, columns=SUMMARY_COLUMNS)
 
 
 def main():
@@ -221,9 +927,21 @@ def main():
         description="Convert ArcGIS skyview raster to csv of horizon points",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter)
 
+    parser.add_argument('inputs', nargs='*', help="Directories or glob patterns of skyview rasters (batch mode)")
     parser.add_argument('--sky',  type=str, help="Path to ArcSky raster")
     parser.add_argument('--out', type=str, default=None, help="Path to output csv with file extension")
     parser.add_argument('--id', default=1, type=int, help="Value of sky patch in skyview raster.  ArcGIS default is: 1 = sky, -1 = ground, -3 = nodata")
+    parser.add_argument('--delta', type=float, nargs='+', default=[2], help="Azimuth spacing of horizon file in degrees. If several are given, one file is written for each, e.g. horizon_1deg.csv")
+    parser.add_argument('--vector-file', type=str, default=None, help="Also write sky polygons to this shapefile (for debugging)")
+    parser.add_argument('--backend', choices=BACKENDS, default=None, help="Horizon extraction method. Default is gdal if it is installed, otherwise numpy")
+    parser.add_argument('--scan-mode', choices=SCAN_MODES, default='outer', help="For numpy backend: use the outermost sky pixel or the first obstruction along each azimuth")
+    parser.add_argument('--out-dir', type=str, default=None, help="Batch mode: directory for horizon files. Default is next to each raster")
+    parser.add_argument('--summary', type=str, default=None, help="Batch mode: path to summary csv of horizons and sky view factors")
+    parser.add_argument('--jobs', type=int, default=1, help="Batch mode: number of worker processes")
+    parser.add_argument('--cache', type=str, default=None, help="Directory in which to cache extracted horizons, so that unchanged rasters are not converted again")
+    parser.add_argument('--clear-cache', action='store_true', help="Remove all entries from the --cache directory before converting")
+    parser.add_argument('--bands', action='store_true', help="Batch mode: treat every band of multi-band rasters as a station and stream them one at a time (numpy radial scans)")
+    parser.add_argument('--svf-only', action='store_true', help="Batch mode: only calculate sky view factor from raster pixels, without writing horizon files")
 
     args = parser.parse_args()
 
@@ -231,16 +949,74 @@ def main():
         parser.print_help(sys.stderr)
         sys.exit(1)
 
+    delta = args.delta[0] if len(args.delta) == 1 else args.delta
+
+    if args.clear_cache:
+        if not args.cache:
+            parser.error("--clear-cache requires --cache")
+        HorizonCache(args.cache).clear()
+
+        if not (args.inputs or args.sky):
+            return
+
+    if not (args.inputs or args.sky):
+        parser.error("give raster directories or patterns (batch mode), or a single --sky raster")
+
+    if not args.inputs:
+        batch_only = [flag for (flag, given) in [
+            ('--out-dir', args.out_dir is not None), ('--summary', args.summary is not None),
+            ('--jobs', args.jobs != parser.get_default('jobs')), ('--bands', args.bands),
+            ('--svf-only', args.svf_only)] if given]
+        if batch_only:
+            parser.error("{} only apply in batch mode; give raster directories or patterns "
+                         "instead of --sky".format(", ".join(batch_only)))
+
+    if args.inputs:
+        if args.out or args.vector_file:
+            parser.error("--out and --vector-file apply to a single --sky raster; "
+                         "use --out-dir in batch mode")
+
+        logging.basicConfig(level=logging.INFO, format='%(levelname)-8s %(message)s')
+
+        inputs = args.inputs + ([args.sky] if args.sky else [])
+
+        if args.bands:
+            summary = convert_bands(inputs, args.out_dir or ".", sky_value=args.id,
+                                    scan_mode=args.scan_mode, delta_phi=delta)
+            if args.summary:
+                summary.to_csv(args.summary, index=False)
+                logging.info("Summary written to {}".format(args.summary))
+            return
+
+        files = find_rasters(inputs)
+        logging.info("Converting {} rasters".format(len(files)))
+
+        summary = convert_rasters(files, args.out_dir, args.jobs, sky_value=args.id,
+                                  backend=args.backend, scan_mode=args.scan_mode,
+                                  svf_only=args.svf_only, delta_phi=delta, cache_dir=args.cache)
+
+        if args.summary:
+            summary.to_csv(args.summary, index=False)
+            logging.info("Summary written to {}".format(args.summary))
+
+        failed = summary['error'].notna().sum()
+        if failed:
+            logging.warning("{} of {} rasters could not be converted".format(failed, len(files)))
+            sys.exit(1)
+
+        return
+
     out_file = args.out
     in_file = args.sky
 
     if out_file is None:
         out_file = re.sub("\\..*$", ".csv", in_file)
 
-    AS = ArcSky()
+    AS = ArcSky(vector_file=args.vector_file, backend=args.backend, scan_mode=args.scan_mode,
+                cache_dir=args.cache)
     AS.setSkyClassValue(args.id)
     AS.open_new_file(in_file)
-    AS.write_horizon_file(out_file)
+    AS.write_horizon_file(out_file, delta)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,237 @@
+import hashlib
+import io
+import sqlite3
+import time
+
+import numpy as np
+
+import horizonpy
+from horizonpy.horizon import Horizon
+from horizonpy import skyview
+
+
+def _helbig(azimuth, horizon, delta_phi=1):
+    return skyview.svf_helbig_2009(Horizon(azimuth, horizon), delta_phi)
+
+
+def _steyn(azimuth, horizon, n=36):
+    return skyview.svf_steyn_1980(azimuth, horizon, n)
+
+
+def _steyn_analytic(azimuth, horizon, n=36):
+    return skyview.svf_steyn_1980_analytic(azimuth, horizon, n)
+
+
+def _discretized(azimuth, horizon, aspect=0, dip=0, increment=2):
+    return skyview.SVF_discretized(azimuth, horizon, aspect, dip, increment)
+
+
+def _contour(azimuth, horizon, aspect=0, dip=0):
+    return skyview.svf_contour(azimuth, horizon, aspect, dip)
+
+
+def _rotate(azimuth, horizon, aspect=0, dip=0, oob='zero'):
+    return skyview.rotate_horizon(azimuth, horizon, aspect, dip, oob)
+
+
+SVF_METHODS = {'svf_helbig_2009': _helbig,
+               'svf_steyn_1980': _steyn,
+               'svf_steyn_1980_analytic': _steyn_analytic,
+               'SVF_discretized': _discretized,
+               'svf_contour': _contour}
+
+# Bump the version of a method whenever its results change, so that entries
+# computed by older code are not served. Unlisted methods are version 1.
+METHOD_VERSIONS = {'SVF_discretized': 2,
+                   'svf_contour': 2,
+                   'compute_svf': 2}  # horizonpy.svfbatch.compute_svf
+
+
+class SVFCache(object):
+    """
+    Persistent, content-addressed cache of sky view factor results.
+
+    Results are stored in a local SQLite database keyed on a hash of the
+    horizon arrays, the method name and its parameters. The least recently
+    used entries are evicted once the stored results exceed ``max_size``
+    bytes. Hit and miss counts are kept for the lifetime of the object.
+
+    Access times of hits are buffered in memory and written in batches, so a
+    hit is a single read. They are written before every insertion and on
+    :meth:`close`.
+
+    Parameters
+    ----------
+    path : str
+        path to the SQLite database file. It is created if it does not exist.
+    max_size : int
+        maximum total size in bytes of stored results
+    flush_every : int
+        number of buffered access times that triggers a write
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> azimuth = np.arange(0, 360, 10)
+    >>> with SVFCache(":memory:") as cache:
+    ...     F1 = cache.svf(azimuth, azimuth * 0 + 30, 'svf_helbig_2009')
+    ...     F2 = cache.svf(azimuth, azimuth * 0 + 30, 'svf_helbig_2009')
+    ...     cache.hits, cache.misses
+    (1, 1)
+    """
+
+    def __init__(self, path, max_size=256 * 2**20, flush_every=1000):
+        self.path = path
+        self.max_size = max_size
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self._accessed = dict()
+        self._connection = sqlite3.connect(path, timeout=30)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS results ("
+                                 "key TEXT PRIMARY KEY, "
+                                 "value BLOB NOT NULL, "
+                                 "size INTEGER NOT NULL, "
+                                 "accessed REAL NOT NULL)")
+        self._connection.commit()
+
+    @staticmethod
+    def make_key(method, azimuth, horizon, **params):
+        """ Hash a method name, horizon arrays and parameters into a cache key
+
+        The key includes the package version and the version of the method
+        in ``METHOD_VERSIONS``.
+        """
+        azimuth = np.ascontiguousarray(azimuth, dtype=float)
+        horizon = np.ascontiguousarray(horizon, dtype=float)
+        params = sorted((k, float(v) if isinstance(v, (int, float, np.number)) else v)
+                        for (k, v) in params.items())
+
+        h = hashlib.sha256()
+        h.update(method.encode())
+        h.update("{}:{}".format(horizonpy.__version__, METHOD_VERSIONS.get(method, 1)).encode())
+        h.update(str(azimuth.size).encode())
+        h.update(azimuth.tobytes())
+        h.update(horizon.tobytes())
+        h.update(repr(params).encode())
+        return h.hexdigest()
+
+    def get(self, key):
+        """ Return the cached value for a key, or None """
+        row = self._connection.execute("SELECT value FROM results WHERE key = ?",
+                                       (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._accessed[key] = time.time()
+        if len(self._accessed) >= self.flush_every:
+            self.flush()
+
+        value = np.load(io.BytesIO(row[0]), allow_pickle=False)
+        return value[()] if value.ndim == 0 else value
+
+    def put(self, key, value):
+        """ Store a value (scalar or array) under a key """
+        buffer = io.BytesIO()
+        np.save(buffer, np.asarray(value), allow_pickle=False)
+        blob = buffer.getvalue()
+
+        self._write_accessed()
+        self._connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                                 (key, blob, len(blob), time.time()))
+        self._evict()
+        self._connection.commit()
+
+    def flush(self):
+        """ Write buffered access times to the database """
+        self._write_accessed()
+        self._connection.commit()
+
+    def _write_accessed(self):
+        if self._accessed:
+            self._connection.executemany("UPDATE results SET accessed = ? WHERE key = ?",
+                                         [(t, k) for (k, t) in self._accessed.items()])
+            self._accessed.clear()
+
+    def get_or_compute(self, method, func, azimuth, horizon, **params):
+        """ Return a cached result, calling func(azimuth, horizon, **params) on a miss """
+        key = self.make_key(method, azimuth, horizon, **params)
+        value = self.get(key)
+
+        if value is None:
+            value = func(azimuth, horizon, **params)
+            self.put(key, value)
+
+        return value
+
+    def svf(self, azimuth, horizon, method='SVF_discretized', **params):
+        """ Calculate (or look up) sky view factor
+
+        Parameters
+        ----------
+        azimuth : array_like
+            Array of azimuths in degrees
+        horizon : array_like
+            Array of horizon angles in degrees
+        method : str
+            One of 'svf_helbig_2009', 'svf_steyn_1980',
+            'svf_steyn_1980_analytic', 'SVF_discretized' or 'svf_contour'
+        params :
+            keyword arguments for the method, e.g. aspect, dip, increment,
+            delta_phi or n
+
+        Returns
+        -------
+        float
+            Sky view factor between 0 and 1
+        """
+        if method not in SVF_METHODS:
+            raise ValueError("Unknown sky view factor method: {}".format(method))
+
+        return self.get_or_compute(method, SVF_METHODS[method], azimuth, horizon, **params)
+
+    def rotate_horizon(self, azimuth, horizon, aspect, dip, oob='zero'):
+        """ Calculate (or look up) rotated horizon angles relative to a plane """
+        return self.get_or_compute('rotate_horizon', _rotate, azimuth, horizon,
+                                   aspect=aspect, dip=dip, oob=oob)
+
+    def _evict(self):
+        total = self.size()
+
+        while total > self.max_size:
+            key, size = self._connection.execute("SELECT key, size FROM results "
+                                                 "ORDER BY accessed ASC LIMIT 1").fetchone()
+            self._connection.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+
+    def size(self):
+        """ Total size in bytes of stored results """
+        return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def stats(self):
+        """ Cache statistics as a dict """
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self),
+                'size': self.size()}
+
+    def clear(self):
+        """ Remove all stored results """
+        self._accessed.clear()
+        self._connection.execute("DELETE FROM results")
+        self._connection.commit()
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,161 +1,280 @@
-#hemisample py
+# hemisample py
 # For even sampling over a hemisphere
-from math import pi
-from numpy import sin, cos, exp, sqrt, histogram, random, zeros_like
-import numpy as np
-import scipy.stats as st
+#
+# Samplers take a ``seed`` that may be an int, None or a numpy.random.Generator
+# and draw all values for a call at once. Importing the module has no side
+# effects.
 import numpy as np
 
+from horizonpy.horizon import HorizonTable
 
-class my_pdf(st.rv_continuous):
 
-    def _pdf(self,x):
-        return (pi/2.)*cos(pi*x/2.)  # Normalized over its range, in this case [0,1]
+def cosine_pdf(x):
+    """ Probability density (pi/2) cos(pi x/2), normalized over [0, 1] """
+    return (np.pi / 2.) * np.cos(np.pi * np.asarray(x) / 2.)
 
-px =lambda x: (pi/2.)*cos(pi*x/2.)
 
-my_cv = my_pdf(a=0, b=1, name='my_pdf')
-z = my_cv.rvs(size=3000)
+px = cosine_pdf
 
-plt.hist(z, bins=np.arange(0, 1, 0.05))
-plt.plot(np.arange(0,3, 0.05), np.cos(np.arange(0,3, 0.05)*(2*np.pi)/4)*200);plt.show()
 
-class gaussian_gen(st.rv_continuous):
-    "Gaussian distribution"
-    def _pdf(self, x):
-        return exp(-x**2 / 2.) / sqrt(2.0 * pi)
+def cosine_sampler(n, seed=None):
+    """ Draw samples from :func:`cosine_pdf` by inverting its CDF
 
-gaussian = gaussian_gen(name='gaussian')
+    The CDF is sin(pi x/2), so x = (2/pi) arcsin(u) for uniform u.
 
-def rejection_sampler(p, xbounds, pmax):
-    while True:
-        x = np.random.rand(1) * (xbounds[1] - xbounds[0]) + xbounds[0]
-        y = np.random.rand(1) * pmax
-        if y <= p(x):
-            return x
+    Parameters
+    ----------
+    n : int
+        number of samples
+    seed : int or numpy.random.Generator, optional
+        random seed or generator
+
+    Returns
+    -------
+    array
+        (n,) samples in [0, 1)
+
+    Examples
+    --------
+    >>> x = cosine_sampler(100000, seed=0)
+    >>> round(float(np.mean(x < 0.5)), 2)  # sin(pi/4)
+    0.71
+    """
+    u = np.random.default_rng(seed).random(n)
+    return (2 / np.pi) * np.arcsin(u)
+
+
+def rejection_sampler(p, xbounds, pmax, size=1, seed=None, block_size=2**16, max_block=2**22):
+    """ Draw samples from an arbitrary density by rejection sampling
+
+    Candidates are drawn and accepted in vectorized blocks until ``size``
+    samples have been accepted.
+
+    Parameters
+    ----------
+    p : callable
+        vectorized probability density, not necessarily normalized
+    xbounds : tuple
+        (min, max) range of samples
+    pmax : float
+        upper bound of ``p`` over ``xbounds``
+    size : int
+        number of samples
+    seed : int or numpy.random.Generator, optional
+        random seed or generator
+    block_size : int
+        minimum number of candidates drawn at a time
+    max_block : int
+        maximum number of candidates drawn at a time, which bounds memory
+        use for densities with a low acceptance rate
+
+    Returns
+    -------
+    array
+        (size,) samples
+
+    Examples
+    --------
+    >>> x = rejection_sampler(cosine_pdf, (0, 1), np.pi / 2, size=100000, seed=0)
+    >>> x.shape, round(float(np.mean(x < 0.5)), 2)
+    ((100000,), 0.71)
+    """
+    rng = np.random.default_rng(seed)
+    samples = np.empty(size)
+    found = 0
+    rate = 0.5  # running estimate of acceptance rate
 
+    while found < size:
+        m = min(max(block_size, int(1.1 * (size - found) / rate)), max(max_block, block_size))
+        x = rng.uniform(xbounds[0], xbounds[1], m)
+        y = rng.uniform(0, pmax, m)
+
+        accepted = x[y <= p(x)]
+        rate = max(accepted.size / m, 1e-3)
+
+        k = min(accepted.size, size - found)
+        samples[found:found + k] = accepted[:k]
+        found += k
+
+    return samples
 
 
 # https://stats.stackexchange.com/questions/7977/how-to-generate-uniformly-distributed-points-on-the-surface-of-the-3-d-unit-sphe
-def hatbox_sampler(n, planar = False):
-    # create random sampling of a hemisphere
-    # returns azimuth and horizon in degrees.
-    # theta, hor = hatbox_sampler(10000)
-    # plt.hist(theta, bins=np.arange(1,360,1 ));plt.show()
-    # plt.hist(hor, bins = np.arange(1,90,1))
-    # plt.plot(np.arange(0, 90, 1), np.cos(np.arange(0, 90, 1)*(2*np.pi)/360)*sin(np.radians(1))*100000/2)
-    # plt.show()
-
-    z = random.uniform(-1, 1, n)
-    theta = random.uniform(-np.pi , np.pi, n)
-    x = np.sin(theta) * np.sqrt(1 - np.power(z, 2))
-    y = np.cos(theta) * np.sqrt(1 - np.power(z, 2))
+def hatbox_sampler(n, planar=False, seed=None):
+    """ Uniform random directions on a hemisphere
+
+    Parameters
+    ----------
+    n : int
+        number of directions
+    planar : bool
+        whether to return points projected onto the horizontal plane
+    seed : int or numpy.random.Generator, optional
+        random seed or generator
+
+    Returns
+    -------
+    tuple
+        (x, y) coordinates on the unit disk if ``planar``, otherwise
+        (azimuth, horizon) in degrees
+    """
+    rng = np.random.default_rng(seed)
+    z = rng.uniform(-1, 1, n)
+    theta = rng.uniform(-np.pi, np.pi, n)
+    r = np.sqrt(1 - z * z)
 
     if planar:
-        return x, y
-    else:
-        r = np.sqrt(np.power(x, 2) + np.power(y, 2))
-        h = np.degrees(np.arccos(r))
+        return np.sin(theta) * r, np.cos(theta) * r
 
-        return np.degrees(theta) % 360, h
+    return np.degrees(theta) % 360, np.degrees(np.arccos(r))
 
-    # check equirectangular vs. top-down
 
+def cosine_hemisphere_sampler(n, seed=None):
+    """ Cosine-weighted (Lambertian) random directions on a hemisphere
 
-# import pandas as pd
-# from shapely.geometry import LineString, Polygon, LinearRing, Point, MultiPoint
-#
-# df = pd.read_csv(r"C:\Users\Nick\src\HorizonPy\SampleHorizonImages\Horizon_3.hpt.csv")
-# df = df.drop(['X','Y','Image Azimuth'], axis=1)
-# df = df.append(df.iloc[0,:])
-# df = df.reset_index()
-# # project onto plane
-# df['m'] = np.cos(np.radians(df['Horizon']))
-# df['me'] = 2 * np.radians(90 - df['Horizon']) / np.pi
-#
-# df['X'] = np.cos(np.radians(df['True Azimuth'])) * df['m']
-# df['Y'] = np.sin(np.radians(df['True Azimuth'])) * df['m']
-#
-# # equirect
-# df['Xe'] = np.cos(np.radians(df['True Azimuth'])) * df['me']
-# df['Ye'] = np.sin(np.radians(df['True Azimuth'])) * df['me']
-#
-#
-# # create polygon
-# P = Polygon(p for p in zip(df['X'], df['Y']))
-#
-# # make random points
-# th, hr = hatbox_sampler(5000, True)
-#
-# # create Multipoint
-# rdm = MultiPoint([p for p in zip(th, hr)])
-#
-# # test intersection
-# int = pd.Series([p.intersects(P) for p in rdm])
-#
-# plt.plot(th[int], hr[int], 'g.')
-# plt.plot(th[~int], hr[~int], 'r.')
-# plt.show()
-#
-#
-# plt.plot(th, hr, 'g.')
-# plt.plot(df['X'], df['Y'], 'r')
-# plt.plot(df['Xe'], df['Ye'], 'b')
-# plt.show()
-#
-#
-# plt.plot(*P.exterior.xy)
-# Polygon()
-#
-# plt.plot()
-#
-# def skyview_stochastic(horizon, azimuth, n):
-#     if not (horizon[0] == horizon[-1] and azimuth[0] == azimuth[-1]):
-#         horizon = np.append(horizon, horizon[0])
-#         azimuth = np.append(azimuth, azimuth[0])
-#
-#     # Project horizon points onto plane (should this be equirectangular?)
-#     r = np.cos(np.radians(horizon)) # 2*np.radians(90-horizon) / np.pi
-#     sky_x = np.cos(np.radians(azimuth)) * r
-#     sky_y = np.sin(np.radians(azimuth)) * r
-#
-#     # make sky polygon
-#     P = Polygon(p for p in zip(horizon, azimuth))
-#
-#     # generate random sampling points
-#     x, y = hatbox_sampler(n, planar=True)
-#     pts = MultiPoint([p for p in zip(x, y)])
-#
-#     # find intersecting points
-#     int = pd.Series([p.intersects(P) for p in rdm])
-#
-#
-#
-#
-#
-#
-#     # generate random sampling points and project (equirectangular)
-#     th_s, hr_s = hatbox_sampler(m, planar=False)
-#     r_s =  (90 - hr_s) / 90
-#     sample_x = np.cos(np.radians(th_s)) * r_s
-#     sample_y = np.sin(np.radians(th_s)) * r_s
-#
-#     pts = MultiPoint([p for p in zip(sample_x, sample_y)])
-#
-#     # find intersecting points
-#     int = pd.Series([p.intersects(P) for p in rdm])
-#
-#
-#     x = list()
-#
-#     for i in np.arange(1, n+1):
-#         ti =
-#         pi =
-#         z = np.sin(np.pi * (2 * i-1) / (2 * n)) * (/)
-#         x.append(z)
-#
-#     svf =
-#     return sum(x) * np.pi/(2*n)
-#
-#
+    Points are uniform on the unit disk and lifted onto the hemisphere, so
+    the density of directions is proportional to the sine of elevation.
+
+    Returns
+    -------
+    tuple
+        (azimuth, horizon) in degrees
+    """
+    rng = np.random.default_rng(seed)
+    azimuth = rng.uniform(0, 360, n)
+    r = np.sqrt(rng.random(n))
+
+    return azimuth, np.degrees(np.arccos(r))
+
+
+def batches(sampler, n, batch_size=2**20, seed=None, **kwargs):
+    """ Draw ``n`` samples in batches of at most ``batch_size``
+
+    Useful for tens of millions of directions, which would not fit in
+    memory at once. All batches come from one random stream.
+
+    Examples
+    --------
+    >>> sum(az.size for (az, hor) in batches(hatbox_sampler, 10, batch_size=4, seed=0))
+    10
+    """
+    rng = np.random.default_rng(seed)
+
+    for start in range(0, n, batch_size):
+        yield sampler(min(batch_size, n - start), seed=rng, **kwargs)
+
+
+GOLDEN_RATIO = (1 + np.sqrt(5)) / 2
+
+
+def fibonacci_disk(n, shift=(0, 0)):
+    """ Fibonacci lattice of cosine-weighted hemisphere directions
+
+    Points are spread evenly over the unit disk, which is the projection of
+    a cosine-weighted (Lambertian) hemisphere onto the horizontal plane.
+
+    Parameters
+    ----------
+    n : int
+        number of points
+    shift : tuple
+        (u, v) offsets in [0, 1) added modulo 1 to the lattice
+        (Cranley-Patterson rotation). Random shifts give independent,
+        unbiased replicates of the lattice.
+
+    Returns
+    -------
+    tuple
+        (azimuth, r) arrays: azimuth in degrees and distance from the centre
+        of the disk, equal to the cosine of elevation
+    """
+    i = np.arange(n)
+    u = ((i + 0.5) / n + shift[0]) % 1
+    v = (i / GOLDEN_RATIO + shift[1]) % 1
+
+    return 360 * v, np.sqrt(u)
+
+
+def skyview_stochastic(azimuth, horizon=None, tol=1e-3, n=1024, max_n=2**22,
+                       replicates=8, delta_phi=0.25, seed=None, return_error=False):
+    """ Estimate sky view factor by randomized quasi-Monte Carlo integration
+
+    Cosine-weighted hemisphere directions are drawn from randomly shifted
+    Fibonacci lattices. A direction is sky if it is above the horizon, which
+    is tabulated at regular azimuths. The standard error is estimated from
+    independent replicates, and the number of points per replicate is doubled
+    until the standard error is below ``tol`` or ``max_n`` is reached.
+
+    Parameters
+    ----------
+    azimuth : array_like or Horizon
+        Array of azimuths in degrees, or a Horizon (``horizon`` omitted)
+    horizon : array_like
+        Array of horizon angles in degrees. Angles of 90 or more are fully
+        obscured.
+    tol : float
+        target standard error
+    n : int
+        initial number of points per replicate
+    max_n : int
+        maximum number of points per replicate
+    replicates : int
+        number of independently shifted lattices
+    delta_phi : float
+        azimuth spacing of the horizon table in degrees
+    seed : int or numpy.random.Generator, optional
+        seed for the random shifts
+    return_error : bool
+        whether to also return the standard error
+
+    Returns
+    -------
+    float or tuple
+        Sky view factor between 0 and 1, and if ``return_error`` is True,
+        its standard error
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> azimuth = np.arange(0, 360, 10)
+    >>> horizon = 30 + 10 * np.sin(np.radians(2 * azimuth))
+    >>> F, se = skyview_stochastic(azimuth, horizon, tol=1e-4, seed=1, return_error=True)
+    >>> round(float(F), 3), bool(se <= 1e-4)
+    (0.743, True)
+    """
+    table = HorizonTable(azimuth, horizon, delta_phi)
+    rng = np.random.default_rng(seed)
+    shifts = rng.random((replicates, 2))
+
+    while True:
+        estimates = np.empty(replicates)
+
+        for k in range(replicates):
+            az, r = fibonacci_disk(n, shifts[k])
+            # sky if the distance from the disk centre is less than the
+            # cosine of the horizon angle
+            sky = r < np.cos(np.radians(np.clip(table(az), 0, 90)))
+            estimates[k] = np.count_nonzero(sky) / n
+
+        F_sky = estimates.mean()
+        error = estimates.std(ddof=1) / np.sqrt(replicates)
+
+        if error <= tol or 2 * n > max_n:
+            break
+
+        n *= 2
+
+    if return_error:
+        return F_sky, error
+
+    return F_sky
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    z = cosine_sampler(3000)
 
+    plt.hist(z, bins=np.arange(0, 1, 0.05), density=True)
+    plt.plot(np.arange(0, 1, 0.01), cosine_pdf(np.arange(0, 1, 0.01)))
+    plt.show()
@@ -0,0 +1,172 @@
+import numpy as np
+
+
+class Horizon(object):
+    """
+    Horizon profile as (azimuth, horizon) pairs.
+
+    Vertices are sorted by azimuth once and stored as contiguous, read-only
+    float arrays. Cartesian unit vectors and regular-grid resamplings are
+    cached on first use, and horizon angles at arbitrary azimuths are found
+    by linear interpolation with 360 degree wrap-around.
+
+    Parameters
+    ----------
+    azimuth : array_like
+        Array of azimuths in degrees
+    horizon : array_like
+        Array of horizon angles in degrees
+
+    Examples
+    --------
+    >>> H = Horizon([270, 90], [30, 10])
+    >>> H.azimuth
+    array([ 90., 270.])
+    >>> H.horizon_at([0, 90, 180])
+    array([20., 10., 20.])
+    """
+    __slots__ = ('_azimuth', '_horizon', '_xp', '_fp', '_vectors', '_grids')
+
+    def __init__(self, azimuth, horizon):
+        azimuth = np.asarray(azimuth, dtype=float).ravel() % 360
+        horizon = np.asarray(horizon, dtype=float).ravel()
+
+        if azimuth.shape != horizon.shape:
+            raise ValueError("azimuth and horizon must have the same length")
+
+        if azimuth.size == 0:
+            raise ValueError("Horizon must have at least one point")
+
+        order = np.argsort(azimuth, kind='stable')
+        self._azimuth = _readonly(azimuth[order])
+        self._horizon = _readonly(horizon[order])
+
+        # add endpoints on either side of sequence so interpolation wraps
+        self._xp = np.concatenate((self._azimuth[-1:] - 360, self._azimuth,
+                                   self._azimuth[:1] + 360))
+        self._fp = np.concatenate((self._horizon[-1:], self._horizon,
+                                   self._horizon[:1]))
+
+        self._vectors = None
+        self._grids = dict()
+
+    @classmethod
+    def from_horizon(cls, azimuth, horizon=None):
+        """ Return ``azimuth`` if it is already a Horizon, otherwise build one """
+        if isinstance(azimuth, cls):
+            return azimuth
+
+        return cls(azimuth, horizon)
+
+    @property
+    def azimuth(self):
+        """ sorted azimuths in degrees """
+        return self._azimuth
+
+    @property
+    def horizon(self):
+        """ horizon angles in degrees, ordered by azimuth """
+        return self._horizon
+
+    @property
+    def vectors(self):
+        """ (3, n) array of (east, north, up) unit vectors for each vertex """
+        if self._vectors is None:
+            az = np.radians(self._azimuth)
+            hor = np.radians(self._horizon)
+            self._vectors = _readonly(np.array((np.cos(hor) * np.sin(az),
+                                                np.cos(hor) * np.cos(az),
+                                                np.sin(hor))))
+        return self._vectors
+
+    def horizon_at(self, azimuth):
+        """ Interpolate horizon angle at one or more azimuths
+
+        Parameters
+        ----------
+        azimuth : array_like
+            azimuths in degrees
+
+        Returns
+        -------
+        array
+            horizon angles in degrees
+        """
+        return np.interp(np.asarray(azimuth, dtype=float) % 360, self._xp, self._fp)
+
+    __call__ = horizon_at
+
+    def resample(self, delta_phi):
+        """ Horizon at evenly spaced azimuths starting from 0
+
+        Parameters
+        ----------
+        delta_phi : float
+            azimuth spacing in degrees
+
+        Returns
+        -------
+        tuple
+            (azimuth, horizon) arrays. Results are cached for each delta_phi.
+
+        Examples
+        --------
+        >>> Horizon([0, 180], [0, 90]).resample(90)
+        (array([  0.,  90., 180., 270.]), array([ 0., 45., 90., 45.]))
+        """
+        key = float(delta_phi)
+
+        if key not in self._grids:
+            phi = np.arange(0, 360, key)
+            self._grids[key] = (_readonly(phi), _readonly(self.horizon_at(phi)))
+
+        return self._grids[key]
+
+    def __len__(self):
+        return self._azimuth.size
+
+    def __repr__(self):
+        return "Horizon(n={}, mean={:.1f})".format(len(self), np.mean(self._horizon))
+
+
+class HorizonTable(object):
+    """
+    Horizon angles tabulated at regular azimuths for fast lookup.
+
+    Parameters
+    ----------
+    azimuth : array_like or Horizon
+        Array of azimuths in degrees, or a Horizon (``horizon`` omitted)
+    horizon : array_like
+        Array of horizon angles in degrees
+    delta_phi : float
+        approximate azimuth spacing of the table in degrees. It is adjusted
+        so that a whole number of steps covers 360 degrees.
+
+    Examples
+    --------
+    >>> T = HorizonTable([0, 180], [0, 90], delta_phi=1)
+    >>> T([45, 315.5])
+    array([22.5 , 22.25])
+    """
+
+    def __init__(self, azimuth, horizon=None, delta_phi=0.25):
+        H = Horizon.from_horizon(azimuth, horizon)
+        n = max(int(round(360. / delta_phi)), 1)
+        self.delta_phi = 360. / n
+        table = H.horizon_at(np.arange(n) * self.delta_phi)
+        # repeat first entry so index i + 1 is always valid
+        self.table = np.append(table, table[0])
+
+    def __call__(self, azimuth):
+        """ Linearly interpolated horizon angle at each azimuth """
+        u = (np.asarray(azimuth, dtype=float) % 360) / self.delta_phi
+        i = np.minimum(u.astype(np.intp), self.table.size - 2)
+        w = u - i
+        return (1 - w) * self.table[i] + w * self.table[i + 1]
+
+
+def _readonly(array):
+    array = np.ascontiguousarray(array, dtype=float)
+    array.flags.writeable = False
+    return array
@@ -0,0 +1,174 @@
+"""
+Opt-in timing of the stages of sky view factor and horizon calculations.
+
+Instrumented code wraps each stage in :func:`stage`. Nothing is recorded
+unless a :func:`profile` context is active, in which case wall time, call
+count and array sizes are accumulated for every stage name.
+
+Examples
+--------
+>>> import numpy as np
+>>> from horizonpy.skyview import SVF_discretized
+>>> az = np.arange(0, 360, 10)
+>>> with profile() as P:
+...     F = SVF_discretized(az, az * 0 + 30, 130, 35)
+>>> sorted(P.stats())[:2]
+['skyview.integrate', 'skyview.interpolate']
+>>> P.stats()['skyview.rotate']['calls']
+1
+"""
+import json
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+_active = []
+
+
+class _NullStage(object):
+    """ Stage context used when profiling is disabled """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage(object):
+    __slots__ = ('_profiles', '_name', '_size', '_start')
+
+    def __init__(self, profiles, name, size):
+        self._profiles = profiles
+        self._name = name
+        self._size = size
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        elapsed = time.perf_counter() - self._start
+        for p in self._profiles:
+            p.add(self._name, elapsed, self._size)
+        return False
+
+
+class Profile(object):
+    """
+    Accumulated timings per stage name.
+
+    For each stage the number of calls, the total and maximum wall time in
+    seconds and the total and maximum array size are recorded.
+    """
+
+    def __init__(self):
+        self._stats = dict()
+
+    def add(self, name, elapsed, size=None):
+        """ Record one call of a stage """
+        s = self._stats.get(name)
+
+        if s is None:
+            s = self._stats[name] = {'calls': 0, 'time': 0.0, 'max_time': 0.0,
+                                     'size': 0, 'max_size': 0}
+
+        s['calls'] += 1
+        s['time'] += elapsed
+        s['max_time'] = max(s['max_time'], elapsed)
+
+        if size is not None:
+            s['size'] += int(size)
+            s['max_size'] = max(s['max_size'], int(size))
+
+    def stats(self):
+        """ Statistics for each stage as a dict of dicts """
+        return {name: dict(s) for (name, s) in self._stats.items()}
+
+    def total(self):
+        """ Total time in seconds recorded over all stages """
+        return sum(s['time'] for s in self._stats.values())
+
+    def to_json(self, **kwargs):
+        """ Statistics as a JSON string """
+        return json.dumps(self.stats(), **kwargs)
+
+    def reset(self):
+        self._stats.clear()
+
+    def __repr__(self):
+        lines = ["{:<32} {:>8} {:>12} {:>12}".format("stage", "calls", "time [s]", "size")]
+        for (name, s) in sorted(self._stats.items()):
+            lines.append("{:<32} {:>8} {:>12.6f} {:>12}".format(name, s['calls'],
+                                                                s['time'], s['size']))
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile(recorder=None):
+    """ Record stage timings for code run inside the context
+
+    Parameters
+    ----------
+    recorder : Profile, optional
+        Profile to add timings to. A new one is created if not given. Passing
+        the same Profile to several contexts accumulates timings, for example
+        across all stations of a batch job.
+
+    Yields
+    ------
+    Profile
+        timings recorded inside the context. Contexts may be nested, in
+        which case each active Profile records every stage.
+    """
+    recorder = Profile() if recorder is None else recorder
+    _active.append(recorder)
+    try:
+        yield recorder
+    finally:
+        _active.remove(recorder)
+
+
+def enabled():
+    """ Whether any profile context is active """
+    return bool(_active)
+
+
+def stage(name, size=None):
+    """ Context manager timing one stage
+
+    Parameters
+    ----------
+    name : str
+        stage name, e.g. 'skyview.rotate'
+    size : int, optional
+        size of the data processed by the stage, e.g. number of vertices
+
+    Returns
+    -------
+    context manager
+        a shared no-op context if profiling is disabled
+    """
+    if not _active:
+        return _NULL_STAGE
+
+    return _Stage(tuple(_active), name, size)
+
+
+def timed(name):
+    """ Decorator timing every call of a function as one stage """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return func(*args, **kwargs)
+
+            with _Stage(tuple(_active), name, None):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator
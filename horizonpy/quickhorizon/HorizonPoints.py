@@ -2,7 +2,7 @@ import csv
 import pandas as pd
 import logging
 import numpy as np
-from scipy.interpolate import interp1d
+from horizonpy.horizon import Horizon
 from horizonpy.quickhorizon.geometry import calculate_true_azimuth, find_angle
 from uuid import uuid1
 
@@ -37,32 +37,35 @@ class HorizonPoints:
     def __get_import_method(self, data_type):
         pass
 
-    def export_to_geotop(self, f_name, delta):
-        """ Save the horizon points to a geotop CSV file
-
-        f_name : str
-            file path
+    def to_horizon(self):
+        """ Return the horizon points as a :class:`~horizonpy.horizon.Horizon`
 
-        delta : int
-            Discretization interval for azimuth spline
+        Horizon angles are limited to 90 degrees.
         """
         az = np.array([x[4] for x in self.get()])
         hor = np.array([x[2] for x in self.get()])
 
         hor[hor >= 90] = 90
 
-        az = az[np.argsort(az)]
-        hor = hor[np.argsort(az)]  # sorting to order by azimuth
+        return Horizon(az, hor)
+
+    def export_to_geotop(self, f_name, delta, horizon=None):
+        """ Save the horizon points to a geotop CSV file
 
-        # Create spline equation to obtain hor(az) for any azimuth
-        # add endpoints on either side of sequence so interpolation is good
-        x = np.concatenate((az[-2:] - 360, az, az[:2] + 360))
-        y = np.concatenate((hor[-2:], hor, hor[:2]))
-        f_hor = interp1d(x, y, kind='linear')
+        f_name : str
+            file path
+
+        delta : int
+            Discretization interval for azimuth spline
+
+        horizon : Horizon, optional
+            Horizon to export instead of the digitized points
+        """
+        if horizon is None:
+            horizon = self.to_horizon()
 
-        # Interpolate horizon at evenly spaced interval using spline
-        phi = np.array(range(0, 360, delta))
-        theta_h = f_hor(phi)
+        # Interpolate horizon at evenly spaced interval
+        phi, theta_h = horizon.resample(delta)
 
         df = zip(phi, ["{:.2f}".format(t) for t in theta_h])
         df = pd.DataFrame(df)
@@ -0,0 +1,180 @@
+import logging
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+
+class ImagePyramid:
+    """
+    Copies of an image resized to each zoom level, built on demand.
+
+    Resized images are kept in a bounded least-recently-used cache, so that
+    switching between recently used zoom levels is a lookup instead of a
+    resample of the full image. Neighbouring levels can be built ahead of
+    time in a background thread.
+
+    Parameters
+    ----------
+    image : PIL.Image.Image
+        full resolution image
+    zoom : dict
+        scale factor for each zoom level, e.g. ``MainView.mux``
+    max_levels : int
+        maximum number of resized images to keep
+    background : bool
+        whether :meth:`prefetch` builds levels in a background thread. If
+        False, prefetching does nothing.
+    """
+
+    def __init__(self, image, zoom, max_levels=3, background=True):
+        # decode lazily opened files now: PIL loads pixel data on first
+        # access, which is not safe to do from several threads at once
+        image.load()
+        self.image = image
+        self.zoom = dict(zoom)
+        self.max_levels = max(int(max_levels), 1)
+        self.background = background
+
+        self._levels = OrderedDict()
+        self._pending = dict()
+        self._lock = threading.Lock()
+
+    def size(self, level):
+        """ (width, height) of the image at a zoom level """
+        w, h = self.image.size
+        return (int(w * self.zoom[level]), int(h * self.zoom[level]))
+
+    def get(self, level):
+        """ Image resized to a zoom level
+
+        Waits for the level if it is being built by another thread.
+        """
+        while True:
+            with self._lock:
+                if level in self._levels:
+                    self._levels.move_to_end(level)
+                    return self._levels[level]
+
+                pending = self._pending.get(level)
+                if pending is None:
+                    pending = self._pending[level] = threading.Event()
+                    break
+
+            pending.wait()
+
+        try:
+            scaled = self._resize(level)
+        finally:
+            with self._lock:
+                del self._pending[level]
+            pending.set()
+
+        with self._lock:
+            self._levels[level] = scaled
+            self._levels.move_to_end(level)
+            while len(self._levels) > self.max_levels:
+                self._levels.popitem(last=False)
+
+        return scaled
+
+    def _resize(self, level):
+        size = self.size(level)
+
+        if size == self.image.size:
+            return self.image
+
+        logging.debug("Resizing image to {} x {}".format(*size))
+        return self.image.resize(size, Image.LANCZOS)
+
+    def view(self, level, viewport, size):
+        """ Region of the image at a zoom level
+
+        The region is cropped from the cached level if it exists, otherwise
+        only the region itself is resampled from the full resolution image.
+        Parts of the region outside of the image are black.
+
+        Parameters
+        ----------
+        level : int
+            zoom level
+        viewport : tuple
+            (x, y) of the top left corner of the region, in pixels of the
+            zoomed image
+        size : tuple
+            (width, height) of the region
+
+        Returns
+        -------
+        PIL.Image.Image
+            image of the given size
+        """
+        x, y = viewport
+        w, h = size
+
+        with self._lock:
+            scaled = self._levels.get(level)
+
+        if scaled is None and self.size(level) == self.image.size:
+            scaled = self.image
+
+        if scaled is not None:
+            return scaled.crop((x, y, x + w, y + h))
+
+        # visible part of the zoomed image, with the same scale in x and y as
+        # the whole resized level
+        W, H = self.size(level)
+        sx, sy = W / self.image.width, H / self.image.height
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, W), min(y + h, H)
+
+        region = Image.new(self.image.mode, (w, h))
+        if self.image.mode == 'P':
+            region.putpalette(self.image.getpalette())
+
+        if x1 > x0 and y1 > y0:
+            part = self.image.resize((x1 - x0, y1 - y0), Image.LANCZOS,
+                                     box=(x0 / sx, y0 / sy, x1 / sx, y1 / sy))
+            region.paste(part, (x0 - x, y0 - y))
+
+        return region
+
+    def prefetch(self, levels):
+        """ Build zoom levels in a background thread
+
+        Levels that are cached, already being built or not in ``zoom`` are
+        skipped. At most ``max_levels - 1`` levels are built so that the
+        level currently in use is not evicted.
+        """
+        if not self.background:
+            return None
+
+        with self._lock:
+            levels = [n for n in levels if n in self.zoom and
+                      n not in self._levels and n not in self._pending]
+
+        levels = levels[:self.max_levels - 1]
+
+        if not levels:
+            return None
+
+        thread = threading.Thread(target=self._build, args=(levels,), daemon=True)
+        thread.start()
+
+        return thread
+
+    def _build(self, levels):
+        for n in levels:
+            self.get(n)
+
+    def __contains__(self, level):
+        with self._lock:
+            return level in self._levels
+
+    def __len__(self):
+        with self._lock:
+            return len(self._levels)
+
+    def clear(self):
+        with self._lock:
+            self._levels.clear()
@@ -8,8 +8,7 @@ except ImportError:
 import numpy as np
 import matplotlib as mpl
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from horizonpy.skyview import SVF_discretized, add_sky_plot, plot_rotated_points, svf_steyn_1980, rotate_horizon, project_horizon_to_equirectangular
-from shapely.errors import TopologicalError
+from horizonpy.skyview import SVF_discretized, add_sky_plot, plot_rotated_points, svf_steyn_1980_analytic, rotate_horizon, project_horizon_to_equirectangular
 from horizonpy.quickhorizon.geometry import calculate_true_azimuth
 ####################################################################
 # Skyview factor popup
@@ -105,14 +104,9 @@ class SkyViewFactorDialog(tk.Toplevel):
                                              self.surface_asp,
                                              self.surface_dip,
                                              oob="ignore")
-            try:
-                F_sky = svf_steyn_1980(rotated_horizon[0], rotated_horizon[1], 72)
-            except TopologicalError:
-                tkMessageBox.showerror("Error!", "The horizon geometry or rotation angle has caused a topological error."
-                                       "Try simplifying the geometry, or using a smaller rotation")
-            else:
-                tkMessageBox.showinfo(title="SkyView",
-                                      message="Sky view factor = {}".format(F_sky))
+            F_sky = svf_steyn_1980_analytic(rotated_horizon[0], rotated_horizon[1], 72)
+            tkMessageBox.showinfo(title="SkyView",
+                                  message="Sky view factor = {}".format(F_sky))
         else:
             return
 
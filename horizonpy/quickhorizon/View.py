@@ -4,9 +4,10 @@ except ImportError:  # python 2
     import tkinter as tk
     import tkinter.messagebox as tkMessageBox
 
+from horizonpy.quickhorizon.ImagePyramid import ImagePyramid
 from horizonpy.quickhorizon.utils import plot_styles
 import logging
-from PIL import Image, ImageTk, ImageEnhance
+from PIL import ImageTk, ImageEnhance
 from copy import copy
 import numpy as np
 
@@ -27,6 +28,12 @@ class MainView:
 
         self.frame.pack(fill='both', expand=1)
         self.canvas.pack(fill='both', expand=1)
+
+        # canvas item and photo image reused by every render
+        self._canvas_image = None
+        self.p_img = None
+        self._p_img_mode = None
+
         self.reset()
         
     def reset(self):
@@ -37,13 +44,13 @@ class MainView:
         self.zoomed_image = None
 
         self._contrast_value = 1
-        self._old_contrast_value = None
         self._brightness_value = 1
-        self._old_brightness_value = None
 
         self.raw_image = None
         self.orig_image = None
+        self.pyramid = None
         self._show_grid = False
+        self._rendered = None
 
     @property
     def zoom_level(self):
@@ -127,10 +134,9 @@ class MainView:
 
     @contrast_value.setter
     def contrast_value(self, value):
-        self._old_contrast_value = self._contrast_value
-        self._contrast_value = value
+        old_value, self._contrast_value = self._contrast_value, value
         logging.info('Image contrast changed from {:.2f} to {:.2f}'.format(
-                     self._old_contrast_value, self._contrast_value))
+                     old_value, self._contrast_value))
 
     @property
     def brightness_value(self):
@@ -138,33 +144,29 @@ class MainView:
 
     @brightness_value.setter
     def brightness_value(self, value):
-        self.old_brightness_value = self._brightness_value
-        self._brightness_value = value
+        old_value, self._brightness_value = self._brightness_value, value
         logging.info('Image brightness changed from {:.2f} to {:.2f}'.format(
-                     self.old_brightness_value, self._brightness_value))
+                     old_value, self._brightness_value))
 
     def apply_enhancements(self):
         self.enh_image = self.apply_enhancement(self.zoomed_image,
                                                 ImageEnhance.Contrast,
-                                                self.contrast_value,
-                                                self._old_contrast_value)
+                                                self.contrast_value)
 
         self.enh_image = self.apply_enhancement(self.enh_image,
                                                 ImageEnhance.Brightness,
-                                                self.brightness_value,
-                                                self._old_brightness_value)
+                                                self.brightness_value)
 
-    def apply_enhancement(self, image, enhancement, new_value, old_value):
-        if new_value == old_value:
+    def apply_enhancement(self, image, enhancement, value):
+        # a factor of 1 leaves the image unchanged
+        if np.isclose(value, 1):
             return image
         else:
             if image.mode == 'I':
                 logging.info("Cannot apply enhancements to image")
-                self._old_brightness_value = 1
-                self._old_contrast_value = 1
                 return image
 
-            return enhancement(image).enhance(new_value)
+            return enhancement(image).enhance(value)
 
     def to_window(self, p):
         x, y = p
@@ -180,12 +182,9 @@ class MainView:
         if self._old_zoom_level == self.zoom_level:
             return
 
-        raw_x, raw_y = self.raw_image.size
-        new_w = int(raw_x * self.zoomcoefficient)
-        new_h = int(raw_y * self.zoomcoefficient)
-
-        self.scaled_image = self.raw_image.resize((new_w, new_h),
-                                                  Image.ANTIALIAS)
+        # build the new level and its neighbours in the background; until
+        # then only the viewport is resampled
+        self.pyramid.prefetch([self.zoom_level, self.zoom_level + 1, self.zoom_level - 1])
 
         self._old_zoom_level = self.zoom_level
 
@@ -195,7 +194,7 @@ class MainView:
         w = self.frame.winfo_width()
         h = self.frame.winfo_height()
 
-        self.zoomed_image = self.scaled_image.crop((x, y, x + w, y + h))
+        self.zoomed_image = self.pyramid.view(self.zoom_level, (x, y), (w, h))
 
     @property
     def zoomcoefficient(self):
@@ -219,6 +218,7 @@ class MainView:
         self.canvas.config(width=width, height=height)
         self.raw_image = raw_image
         self.orig_image = copy(raw_image)
+        self.pyramid = ImagePyramid(raw_image, self.mux, max_levels=4)
 
     def draw_grid_data(self, grid_data):
         self.canvas.delete("grid")
@@ -285,7 +285,9 @@ class MainView:
                                       tag="selection_rectangle")
 
     def delete_all_overlays(self):
-        self.canvas.delete("all")
+        for item in self.canvas.find_all():
+            if item != self._canvas_image:
+                self.canvas.delete(item)
 
     def plot_azimuth_data(self, image_center, image_azimuth_coords):
         wX, wY = self.to_window(image_center)
@@ -315,10 +317,37 @@ class MainView:
 
     def render_image(self):
         self.scale_image()
+
+        # skip if the image, viewport, window size and enhancements are unchanged
+        state = (id(self.raw_image), self.zoom_level, self.viewport,
+                 self.frame.winfo_width(), self.frame.winfo_height(),
+                 self.contrast_value, self.brightness_value)
+
+        if state == self._rendered and self._has_canvas_image():
+            return
+
         self.crop_image()
         self.apply_enhancements()
-        self.p_img = ImageTk.PhotoImage(self.enh_image)
-        self.canvas.create_image(0, 0, image=self.p_img, anchor="nw")
+        self.show_image(self.enh_image)
+        self._rendered = state
+
+    def show_image(self, image):
+        # Copy image into the photo image on the canvas, reusing both if possible
+        if (self.p_img is not None and self._p_img_mode == image.mode and
+                (self.p_img.width(), self.p_img.height()) == image.size):
+            self.p_img.paste(image)
+        else:
+            self.p_img = ImageTk.PhotoImage(image)
+            self._p_img_mode = image.mode
+
+        if not self._has_canvas_image():
+            self._canvas_image = self.canvas.create_image(0, 0, image=self.p_img, anchor="nw")
+            self.canvas.tag_lower(self._canvas_image)
+        else:
+            self.canvas.itemconfig(self._canvas_image, image=self.p_img)
+
+    def _has_canvas_image(self):
+        return self._canvas_image is not None and bool(self.canvas.type(self._canvas_image))
 
     def adjust_contrast(self, increment, *args):
         self.contrast_value += increment
@@ -1,47 +1,51 @@
 import numpy as np
-from scipy.interpolate import interp1d
-from pandas import DataFrame, read_csv
-from shapely.geometry import LineString, Polygon, LinearRing, Point
 from warnings import warn
 
-import matplotlib.pyplot as plt
+from horizonpy.horizon import Horizon
+from horizonpy.profiling import stage
 
-try: # Python 3.x
-    izip = zip
-except:  # Python 2.7
-    from itertools import izip
+# shapely and matplotlib are imported by the functions that need them so
+# that the numeric core can be imported without them
 
 
-def SVF_discretized(azimuth, horizon, aspect, dip, increment=2):
+def SVF_discretized(azimuth, horizon=None, aspect=0, dip=0, increment=2):
     """
     az1 = np.array(range(0,360,10))
     hor1 = az1 * 0 + 50
     SVF_discretized(az1, hor1, 130, 35, plot=True)
+
+    ``azimuth`` may also be a :class:`~horizonpy.horizon.Horizon`, in which
+    case ``horizon`` is omitted: SVF_discretized(H, aspect=130, dip=35)
     """
+    if isinstance(azimuth, Horizon):
+        azimuth, horizon = azimuth.azimuth, azimuth.horizon
+
+    n = np.size(azimuth)
+
     # rotate horizon coordinates
-    rt = rotate_horizon(azimuth, horizon, aspect, dip)
+    with stage('skyview.rotate', n):
+        rt = rotate_horizon(azimuth, horizon, aspect, dip)
 
     # for overhanging points, flip the azimuth
-    overhanging = test_overhang(rt[0], rt[1])
+    with stage('skyview.overhang', n):
+        overhanging = test_overhang(rt[0], rt[1])
 
     rt[0][overhanging] = (180 + rt[0][overhanging]) % 360
     rt[1][overhanging] = 180 - rt[1][overhanging]
 
-    obs = test_obscured(rt[0], rt[1], increment)
+    with stage('skyview.obscured', n):
+        obs = test_obscured(rt[0], rt[1], increment)
 
     xx = np.append(rt[0], obs)
     yy = np.append(rt[1], (obs * 0 + 90))
-    yy = yy[np.argsort(xx)]
-    xx = xx[np.argsort(xx)]
 
     # skyview:
-    # Create spline equation to obtain horizon(azimuth) for any azimuth
-    # add endpoints on either side of sequence so interpolation is good
-    xx = np.concatenate((xx[-2:] - 360, xx, xx[:2] + 360))
-    yy = np.concatenate((yy[-2:], yy, yy[:2]))
+    # Obtain horizon(azimuth) for any azimuth
+    with stage('skyview.interpolate', xx.size):
+        FF = Horizon(xx, yy)
 
-    FF = interp1d(x=xx, y=yy)
-    F_sky = svf_helbig_2009(FF, increment)
+    with stage('skyview.integrate', int(np.ceil(360 / increment))):
+        F_sky = svf_helbig_2009(FF, increment)
 
     return(F_sky)
 
@@ -57,7 +61,7 @@ def svf_helbig_2009(f, delta_phi=1):
     ----------
     f : function
         function relating azimuth to horizon angle
-    delta_phi : int
+    delta_phi : float
         discretized azimuth width in degrees
 
     Returns
@@ -78,16 +82,73 @@ def svf_helbig_2009(f, delta_phi=1):
 
     """
     # Measure horizon at evenly spaced interval using spline
-    phi = np.array(range(0, 360, delta_phi))
+    phi = np.arange(0, 360, delta_phi)
     theta_h = f(phi)
+    theta_opposite = f((phi + 180) % 360)
+
+    F_sky = _helbig_sum(theta_h, theta_opposite, delta_phi)
+    F_sky = np.round(F_sky, decimals = 5)
+    return(F_sky)
+
+
+def svf_helbig_2009_stack(horizons, block_size=2**20):
+    """Calculate sky view factor for a stack of regularly-sampled horizons
+
+    Vectorized form of :func:`svf_helbig_2009` for horizons that have already
+    been sampled at evenly spaced azimuths, e.g. horizon stacks derived from
+    a DEM. The same rules for overhanging (> 90 degree) horizons are applied.
+
+    Parameters
+    ----------
+    horizons : array_like
+        (stations, m) array of horizon angles in degrees. Column ``j``
+        corresponds to azimuth ``j * 360 / m``. ``m`` must be even so that
+        every azimuth has an opposite.
+    block_size : int
+        approximate number of array elements to process at a time. Limits the
+        size of temporary arrays for very large stacks.
+
+    Returns
+    -------
+    array
+        (stations,) array of sky view factors between 0 and 1
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> horizons = np.array([np.zeros(360), np.zeros(360) + 30])
+    >>> svf_helbig_2009_stack(horizons)
+    array([1.  , 0.75])
+    """
+    horizons = np.atleast_2d(np.asarray(horizons, dtype=float))
+    n, m = horizons.shape
+
+    if m % 2:
+        raise ValueError("Number of azimuth bins must be even")
+
+    delta_phi = 360. / m
+    rows = max(1, block_size // m)
+    F_sky = np.empty(n)
+
+    for start in range(0, n, rows):
+        theta_h = horizons[start:start + rows]
+        theta_opposite = np.roll(theta_h, -(m // 2), axis=1)
+        F_sky[start:start + rows] = _helbig_sum(theta_h, theta_opposite, delta_phi)
+
+    F_sky = np.round(F_sky, decimals = 5)
+    return(F_sky)
+
+
+def _helbig_sum(theta_h, theta_opposite, delta_phi):
+    """ Discretized Helbig (2009) sum over the last axis of ``theta_h`` """
+    theta_h = np.asarray(theta_h, dtype=float)
 
     # Check: don't allow horizons > 90 degrees that are opposite each other
     # This might not be a problem.
-    theta_h = np.array([90 if y > 90 and f((x + 180) % 360) > 90 else y
-                                          for (x, y) in izip(phi, theta_h)])
+    theta_h = np.where((theta_h > 90) & (theta_opposite > 90), 90, theta_h)
 
     #don't allow negative horizon angles
-    theta_h = np.max(np.row_stack((theta_h, theta_h * 0)), axis=0)
+    theta_h = np.maximum(theta_h, 0)
 
     # calculate cos2(theta)
     cos2theta = np.power(np.cos(np.radians(theta_h)), 2)
@@ -95,13 +156,195 @@ def svf_helbig_2009(f, delta_phi=1):
     # To deal with overhanging terrain, take negative cos2() if the horizon
     # is greater than 90. This might be wrong... But otherwise overhanging
     # terrain increases the skyview factor
-    S = [y if x <= 90 else -y for (x, y) in izip(theta_h, cos2theta)]
+    S = np.where(theta_h <= 90, cos2theta, -cos2theta)
 
-    F_sky = (delta_phi / 360.) * np.sum(S)
-    F_sky = np.round(F_sky, decimals = 5)
+    return (delta_phi / 360.) * np.sum(S, axis=-1)
+
+
+def svf_contour(azimuth, horizon, aspect=0, dip=0):
+    """Calculate sky view factor by integrating around the horizon line
+
+    The horizon is treated as a closed polygon of unit vectors joined by
+    great-circle arcs. The cosine-weighted solid angle of the sky above the
+    plane is integrated edge by edge using Lambert's contour formula for the
+    form factor of a spherical polygon, after clipping the polygon to the
+    hemisphere in front of the plane. The result is exact for such polygons
+    and does not require rotating or resampling the horizon, so tilted
+    planes and overhanging horizons (> 90 degrees) are handled directly.
+
+    Parameters
+    ----------
+    azimuth : array_like
+        Array of azimuths in degrees, in the order the horizon is traced
+    horizon : array_like
+        Array of horizon angles in degrees
+    aspect : float
+        azimuth of plane
+    dip : float
+        inclination of plane in direction of aspect
+
+    Returns
+    -------
+    float
+        Sky view factor between 0 and 1
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> azimuth = np.arange(0, 360, 10)
+    >>> horizon = azimuth * 0
+    >>> float(svf_contour(azimuth, horizon))
+    1.0
+    >>> float(svf_contour(azimuth, horizon, aspect=180, dip=60))
+    0.75
+    """
+    V, x, y = _horizon_polygon(azimuth, horizon)
+    total = _contour_integrals(V, x, y, [aspect], [dip])[0]
+
+    F_sky = total / (2 * np.pi)
+    F_sky = np.round(F_sky, decimals=5)
     return(F_sky)
 
 
+def _horizon_polygon(azimuth, horizon):
+    """ Unit vectors of a horizon polygon with the sky on its left, and its equirectangular projection """
+    azimuth = np.asarray(azimuth, dtype=float)
+    horizon = np.asarray(horizon, dtype=float)
+
+    # the sky is the region enclosed by the horizon in an equirectangular
+    # projection; orient the polygon counterclockwise so the sky is on the left
+    x, y = project_horizon_to_equirectangular(azimuth, horizon)
+    if np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y) < 0:
+        azimuth, horizon = azimuth[::-1], horizon[::-1]
+        x, y = x[::-1], y[::-1]
+
+    az, hor = np.radians(azimuth), np.radians(horizon)
+    V = np.column_stack((np.cos(hor) * np.sin(az),
+                         np.cos(hor) * np.cos(az),
+                         np.sin(hor)))
+
+    if np.allclose(V[0], V[-1]):  # drop closing vertex
+        V = V[:-1]
+
+    return V, x, y
+
+
+def _contour_integrals(V, x, y, aspect, dip):
+    """ Lambert contour integral of the sky in front of each plane (2 pi for a full hemisphere)
+
+    Parameters
+    ----------
+    V, x, y :
+        horizon polygon from :func:`_horizon_polygon`
+    aspect, dip : array_like
+        (N,) plane orientations in degrees
+
+    Returns
+    -------
+    array
+        (N,) contour integrals
+    """
+    aspect = np.atleast_1d(np.asarray(aspect, dtype=float))
+    dip = np.atleast_1d(np.asarray(dip, dtype=float))
+    a, d = np.radians(aspect), np.radians(dip)
+    normals = np.column_stack((np.sin(d) * np.sin(a), np.sin(d) * np.cos(a), np.cos(d)))
+    N = normals.shape[0]
+
+    A = V
+    B = np.roll(V, -1, axis=0)
+    dA = normals @ A.T  # (N, M) heights of vertices above each plane
+    dB = np.roll(dA, -1, axis=1)
+    A_in = dA >= 0
+    B_in = dB >= 0
+
+    # horizon edges entirely in front of the plane
+    c = np.cross(A, B)
+    s = np.linalg.norm(c, axis=1)
+    theta = np.arctan2(s, np.sum(A * B, axis=1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        g = np.where(s > 0, theta / s, 0)[:, np.newaxis] * c
+    total = np.sum(np.where(A_in & B_in, normals @ g.T, 0), axis=1)
+
+    # parts of edges in front of the plane, up to the point where they cross it
+    k, i = np.nonzero(A_in != B_in)
+    t = dA[k, i] / (dA[k, i] - dB[k, i])
+    P = A[i] + t[:, np.newaxis] * (B[i] - A[i])
+    P = P / np.linalg.norm(P, axis=1)[:, np.newaxis]
+
+    exit = A_in[k, i]
+    start = np.where(exit[:, np.newaxis], A[i], P)
+    end = np.where(exit[:, np.newaxis], P, B[i])
+    total += np.bincount(k, weights=_arc_form_factor(start, end, normals[k]), minlength=N)
+
+    if k.size:
+        # close the clipped polygon along the plane circle, which is traversed
+        # counterclockwise about the normal (front hemisphere on the left).
+        # Each exit is joined to the next entry in that direction.
+        ref = np.where((np.abs(normals[:, 0]) < 0.9)[:, np.newaxis], [1., 0., 0.], [0., 1., 0.])
+        u = np.cross(normals, ref)
+        u /= np.linalg.norm(u, axis=1)[:, np.newaxis]
+        w = np.cross(normals, u)
+        angle = np.mod(np.arctan2(np.sum(P * w[k], axis=1), np.sum(P * u[k], axis=1)), 2 * np.pi)
+
+        # sort entries by plane, then angle; search each exit in its own plane
+        span = 4 * np.pi
+        entry_key = k[~exit] * span + angle[~exit]
+        order = np.argsort(entry_key)
+        entry_key, entry_k, entry_angle = entry_key[order], k[~exit][order], angle[~exit][order]
+
+        exit_k, exit_angle = k[exit], angle[exit]
+        j = np.searchsorted(entry_key, exit_k * span + exit_angle - 1e-12)
+        wrap = (j >= entry_key.size) | (entry_k[np.minimum(j, entry_key.size - 1)] != exit_k)
+        j = np.where(wrap, np.searchsorted(entry_key, exit_k * span), j)
+
+        arc = np.mod(entry_angle[j] - exit_angle, 2 * np.pi)
+        arc = np.where(arc > 2 * np.pi - 1e-12, 0, arc)  # entry on top of the exit
+        total += np.bincount(exit_k, weights=arc, minlength=N)
+
+    # planes that the horizon does not cross
+    uncrossed = np.bincount(k, minlength=N) == 0
+    front = uncrossed & A_in.all(axis=1)
+    behind = uncrossed & ~A_in.all(axis=1)
+
+    if front.any():
+        # horizon lies entirely in front of the plane: the plane's boundary
+        # circle closes the sky if the region behind the plane is also sky
+        total[front] += 2 * np.pi * _in_polygon(x, y, aspect[front] + 180, dip[front] - 90)
+
+    if behind.any():
+        # horizon lies entirely behind the plane: the plane sees all or nothing
+        total[behind] = 2 * np.pi * _in_polygon(x, y, aspect[behind], 90 - dip[behind])
+
+    return total
+
+
+def _arc_form_factor(start, end, normal):
+    """ Lambert contour term (arc angle times normal component) for great-circle arcs """
+    c = np.cross(start, end)
+    s = np.linalg.norm(c, axis=-1)
+    theta = np.arctan2(s, np.sum(start * end, axis=-1))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        term = np.where(s > 0, theta * np.sum(c * normal, axis=-1) / s, 0)
+
+    return term
+
+
+def _in_polygon(x, y, azimuth, horizon):
+    """ Whether directions lie inside a horizon polygon projected with project_horizon_to_equirectangular """
+    azimuth, horizon = np.broadcast_arrays(np.asarray(azimuth, dtype=float),
+                                           np.asarray(horizon, dtype=float))
+
+    x0, y0 = project_horizon_to_equirectangular(azimuth, horizon)
+    psi = np.arctan2(np.asarray(y) - np.asarray(y0)[..., np.newaxis],
+                     np.asarray(x) - np.asarray(x0)[..., np.newaxis])
+    dpsi = np.diff(np.concatenate((psi, psi[..., :1]), axis=-1), axis=-1)
+    dpsi = (dpsi + np.pi) % (2 * np.pi) - np.pi
+
+    # nadir is never enclosed
+    return (np.abs(np.sum(dpsi, axis=-1)) > np.pi) & (horizon > -90)
+
+
 def annulus(r_in, r_out):
     """ Create an annulus
 
@@ -120,6 +363,8 @@ def annulus(r_in, r_out):
     >>> A.area
     9.409645471637816
     """
+    from shapely.geometry import Point
+
     C1 = Point(0,0).buffer(r_in)
     C2 = Point(0,0).buffer(r_out)
     return C2.difference(C1)
@@ -153,6 +398,8 @@ def svf_steyn_1980(azimuth, horizon, n=36):
     1.0
 
     """
+    from shapely.geometry import Polygon
+
     if not (horizon[0] == horizon[-1] and azimuth[0] == azimuth[-1]):
         horizon = np.append(horizon, horizon[0])
         azimuth = np.append(azimuth, azimuth[0])
@@ -176,6 +423,119 @@ def svf_steyn_1980(azimuth, horizon, n=36):
     return F_sky
 
 
+def svf_steyn_1980_analytic(azimuth, horizon, n=36):
+    """ Calculate sky view factor using method of annuli without shapely
+
+    Equivalent to :func:`svf_steyn_1980`, but the sky proportion of every
+    annulus is calculated exactly from the crossings of the projected horizon
+    polygon with each circle, for all annuli at once. No polygon buffering or
+    boolean operations are performed so awkward (e.g. rotated,
+    self-intersecting) horizons cannot raise topology errors.
+
+    Parameters
+    ----------
+    azimuth : array_like
+        Array of horizon angles in degrees
+    horizon : array_like
+        Array of horizon angles in degrees
+    n : int
+        Number of annuli
+
+    Returns
+    -------
+    float
+        Sky view factor between 0 and 1
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> azimuth = np.arange(0, 360, 10)
+    >>> horizon = azimuth * 0
+    >>> float(svf_steyn_1980_analytic(azimuth, horizon, n=18))
+    1.00091
+    >>> float(svf_steyn_1980_analytic(azimuth, horizon, n=36))
+    1.00014
+    >>> float(svf_steyn_1980_analytic(azimuth, horizon, n=100))
+    0.99998
+    """
+    azimuth = np.asarray(azimuth, dtype=float)
+    horizon = np.asarray(horizon, dtype=float)
+
+    sky_x, sky_y = project_horizon_to_equirectangular(azimuth, horizon)
+
+    # area of sky polygon inside each circle
+    radii = np.arange(0, n + 1) / n
+    inside = disk_polygon_area(sky_x, sky_y, radii)
+    inside = inside * np.sign(inside[-1])
+
+    i = np.arange(1, n + 1)
+    pi = np.diff(inside)
+    ti = np.pi * (radii[1:] ** 2 - radii[:-1] ** 2)
+    annular_svf = np.sin(np.pi * (2 * i - 1) / (2 * n)) * (pi / ti)
+
+    F_sky = np.sum(annular_svf) * np.pi / (2 * n)
+    F_sky = np.round(F_sky, 5)
+    return F_sky
+
+
+def disk_polygon_area(x, y, radii):
+    """ Calculate the area of a polygon that lies inside circles centred at the origin
+
+    Parameters
+    ----------
+    x, y : array_like
+        coordinates of polygon vertices. The polygon is closed automatically.
+    radii : array_like
+        radii of circles
+
+    Returns
+    -------
+    array
+        Signed area (positive for counterclockwise polygons) of the polygon
+        inside each circle
+
+    Examples
+    --------
+    >>> disk_polygon_area([-1, 1, 1, -1], [-1, -1, 1, 1], [1, 2])
+    array([3.14159265, 4.        ])
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    R = np.asarray(radii, dtype=float)[:, np.newaxis]
+
+    # polygon edges A -> B
+    ax, ay = x, y
+    bx, by = np.roll(x, -1), np.roll(y, -1)
+    dx, dy = bx - ax, by - ay
+
+    # parameters t1 <= t2 where each edge crosses each circle
+    a = dx * dx + dy * dy
+    b = 2 * (ax * dx + ay * dy)
+    c = ax * ax + ay * ay - R * R
+    disc = b * b - 4 * a * c
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = np.sqrt(np.maximum(disc, 0))
+        t1 = np.where(disc > 0, (-b - root) / (2 * a), 1)
+        t2 = np.where(disc > 0, (-b + root) / (2 * a), 1)
+
+    t1 = np.clip(t1, 0, 1)
+    t2 = np.clip(t2, 0, 1)
+
+    p1x, p1y = ax + t1 * dx, ay + t1 * dy
+    p2x, p2y = ax + t2 * dx, ay + t2 * dy
+
+    def sector(ux, uy, vx, vy):
+        return 0.5 * R * R * np.arctan2(ux * vy - uy * vx, ux * vx + uy * vy)
+
+    # edge is outside circle from A to P1 and from P2 to B, inside from P1 to P2
+    area = (sector(ax, ay, p1x, p1y)
+            + 0.5 * (p1x * p2y - p1y * p2x)
+            + sector(p2x, p2y, bx, by))
+
+    return np.sum(area, axis=1)
+
+
 def rotation_matrix(axis, theta):
     """ Create a rotation matrix
 
@@ -292,8 +652,8 @@ def horiz_to_carte(azimuth, horizon):
     returns cartesian coordinates from a horizon angle and azimuth
     q=horiz_to_carte([0,30], [10,10], [1,1])
     """
-    azimuth = np.asarray(azimuth)
-    horizon = np.asarray(horizon)
+    azimuth = np.array(azimuth, dtype=float)
+    horizon = np.array(horizon, dtype=float)
     azimuth[horizon > 90] = azimuth[horizon > 90] + 180
     horizon[horizon > 90] = 180 - horizon[horizon > 90]
     azimuth = azimuth % 360
@@ -409,6 +769,201 @@ def rotate_horizon(azimuth, horizon, aspect, dip, oob='zero'):
     return(coords)
 
 
+def rotation_matrices(axes, theta):
+    """ Create a stack of rotation matrices
+
+    Vectorized form of :func:`rotation_matrix` returning one counterclockwise
+    rotation matrix for every (axis, theta) pair.
+
+    Parameters
+    ----------
+    axes : array_like
+        (N, 3) array of 3-d vectors specifying axes around which to rotate
+    theta : array_like
+        (N,) array of rotation angles in radians
+
+    Returns
+    -------
+    array
+        N x 3 x 3 rotation tensor
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> R = rotation_matrices([[0, 1, 0], [0, 0, 1]], np.radians([90, 45]))
+    >>> R.shape
+    (2, 3, 3)
+    >>> np.allclose(R[0], rotation_matrix([0, 1, 0], np.radians(90)))
+    True
+    """
+    axes = np.atleast_2d(np.asarray(axes, dtype=float))
+    theta = np.atleast_1d(np.asarray(theta, dtype=float))
+    axes = axes / np.sqrt(np.sum(axes * axes, axis=1))[:, np.newaxis]
+    a = np.cos(theta / 2)
+    b, c, d = (-axes * np.sin(theta / 2)[:, np.newaxis]).T
+    aa, bb, cc, dd = a*a, b*b, c*c, d*d
+    bc, ad, ac, ab, bd, cd = b*c, a*d, a*c, a*b, b*d, c*d
+
+    R = np.array([[aa+bb-cc-dd, 2*(bc+ad), 2*(bd-ac)],
+                  [2*(bc-ad), aa+cc-bb-dd, 2*(cd+ab)],
+                  [2*(bd+ac), 2*(cd-ab), aa+dd-bb-cc]])
+
+    return np.ascontiguousarray(R.transpose(2, 0, 1))
+
+
+_ROTATION_CACHE = dict()
+_ROTATION_CACHE_SIZE = 65536
+
+
+def orientation_rotations(aspect, dip):
+    """ Get the rotation tensor for a set of plane orientations
+
+    Matrices are equivalent to ``rotate_towards(aspect, -dip)`` and are cached
+    per (aspect, dip) pair so that repeated orientations are only built once.
+
+    Parameters
+    ----------
+    aspect : array_like
+        azimuth of each plane in degrees
+    dip : array_like
+        inclination of each plane in degrees
+
+    Returns
+    -------
+    array
+        N x 3 x 3 rotation tensor
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> R = orientation_rotations([135, 0], [30, 0])
+    >>> np.allclose(R[0], rotate_towards(135, -30))
+    True
+    >>> np.allclose(R[1], np.eye(3))
+    True
+    """
+    aspect, dip = np.broadcast_arrays(np.asarray(aspect, dtype=float),
+                                      np.asarray(dip, dtype=float))
+    keys = list(zip(aspect.ravel().tolist(), dip.ravel().tolist()))
+    missing = [k for k in dict.fromkeys(keys) if k not in _ROTATION_CACHE]
+
+    if missing:
+        m_aspect, m_dip = np.radians(np.array(missing).T)
+        axes = np.column_stack((-np.cos(m_aspect), np.sin(m_aspect),
+                                np.zeros_like(m_aspect)))
+        for key, matrix in zip(missing, rotation_matrices(axes, -m_dip)):
+            _ROTATION_CACHE[key] = matrix
+
+        while len(_ROTATION_CACHE) > _ROTATION_CACHE_SIZE:
+            del _ROTATION_CACHE[next(iter(_ROTATION_CACHE))]
+
+    if not keys:
+        return np.empty((0, 3, 3))
+
+    return np.stack([_ROTATION_CACHE[k] for k in keys])
+
+
+def interpolate_periodic_rows(phi, azimuth, horizon):
+    """ Interpolate many horizons at the same azimuths in a single pass
+
+    Parameters
+    ----------
+    phi : array_like
+        (K,) azimuths in degrees at which to evaluate each horizon
+    azimuth : array_like
+        (N, M) array of azimuths in degrees, one horizon per row
+    horizon : array_like
+        (N, M) array of horizon angles in degrees
+
+    Returns
+    -------
+    array
+        (N, K) array of horizon angles, linearly interpolated with 360 degree
+        wrap-around
+
+    Examples
+    --------
+    >>> interpolate_periodic_rows([0, 90], [[90, 270], [0, 180]], [[10, 30], [0, 40]])
+    array([[20., 10.],
+           [ 0., 20.]])
+    """
+    phi = np.asarray(phi, dtype=float) % 360
+    azimuth = np.atleast_2d(np.asarray(azimuth, dtype=float)) % 360
+    horizon = np.atleast_2d(np.asarray(horizon, dtype=float))
+
+    order = np.argsort(azimuth, axis=1, kind='stable')
+    xp = np.take_along_axis(azimuth, order, axis=1)
+    fp = np.take_along_axis(horizon, order, axis=1)
+
+    # add endpoints on either side of each sequence so interpolation wraps
+    xp = np.concatenate((xp[:, -1:] - 360, xp, xp[:, :1] + 360), axis=1)
+    fp = np.concatenate((fp[:, -1:], fp, fp[:, :1]), axis=1)
+
+    # offset each row so that all rows form one increasing sequence
+    offset = 1080. * np.arange(xp.shape[0])[:, np.newaxis]
+    x = (xp + offset).ravel()
+    q = (phi[np.newaxis, :] + offset).ravel()
+
+    return np.interp(q, x, fp.ravel()).reshape(xp.shape[0], phi.size)
+
+
+def svf_orientations(azimuth, horizon, aspect, dip, delta_phi=None, block_size=2**20):
+    """ Calculate sky view factor for many plane orientations at once
+
+    Vectorized form of :func:`svf_contour`: the horizon polygon is clipped
+    to the hemisphere in front of every (aspect, dip) pair and integrated
+    with Lambert's contour formula, with one row per orientation. Results
+    are identical to ``svf_contour``, so overhanging horizons and
+    directions obscured by steep terrain are treated exactly.
+
+    Parameters
+    ----------
+    azimuth : array_like
+        Array of azimuths in degrees, in the order the horizon is traced
+    horizon : array_like
+        Array of horizon angles in degrees
+    aspect : array_like
+        (N,) azimuths of planes in degrees
+    dip : array_like
+        (N,) inclinations of planes in degrees
+    delta_phi : float, optional
+        ignored; the horizon is no longer resampled. Kept for compatibility.
+    block_size : int
+        approximate number of array elements to process at a time. Limits the
+        size of temporary arrays for many orientations or long horizons.
+
+    Returns
+    -------
+    array
+        (N,) array of sky view factors between 0 and 1
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> azimuth = np.arange(0, 360, 10)
+    >>> svf_orientations(azimuth, azimuth * 0, [0, 180, 0], [0, 60, 90])
+    array([1.  , 0.75, 0.5 ])
+    """
+    aspect, dip = np.broadcast_arrays(np.asarray(aspect, dtype=float),
+                                      np.asarray(dip, dtype=float))
+    aspect, dip = aspect.ravel(), dip.ravel()
+
+    with stage('skyview.polygon', np.size(azimuth)):
+        V, x, y = _horizon_polygon(azimuth, horizon)
+
+    rows = max(1, block_size // max(V.shape[0], 1))
+    total = np.empty(aspect.size)
+
+    with stage('skyview.integrate', V.shape[0] * aspect.size):
+        for start in range(0, aspect.size, rows):
+            total[start:start + rows] = _contour_integrals(V, x, y, aspect[start:start + rows],
+                                                           dip[start:start + rows])
+
+    F_sky = total / (2 * np.pi)
+    F_sky = np.round(F_sky, decimals=5)
+    return F_sky
+
+
 def project_horizon_to_equirectangular(azimuth, horizon, r0=1, degrees=True):
     """ Project azimuth and horizon onto x,y plane using equirectangular projection
 
@@ -497,6 +1052,8 @@ def configure_axes(ax):
 
 
 def skyplot_figure():
+    import matplotlib.pyplot as plt
+
     f, ax = plt.subplots(figsize=(5,5), dpi=100,
                                    subplot_kw={'projection': 'polar'})
     configure_axes(ax)
@@ -515,7 +1072,7 @@ def plot_rotated_points(azimuth, horizon, aspect, dip, ax):
     return p
 
 
-def test_overhang(theta, horiz):
+def test_overhang(theta, horiz, return_counts=False):
     """
     for a set of horizon points, detects which ones are overhanging and returns
     a list of True/False for whether the point is overhanging or not
@@ -523,60 +1080,109 @@ def test_overhang(theta, horiz):
     Args:
         theta: array or list of azimuthal directions
         horiz: array or list of horizon angles for each theta
+        return_counts: whether to also return the number of times the ray
+            through each point intersects the horizon line
 
     Returns:
-        numpy array of logical values the same length as theta or horiz
+        numpy array of logical values the same length as theta or horiz. If
+        return_counts is True, a tuple of that array and an array of
+        intersection counts.
     """
     # ensure inputs are arrays
-    theta = np.asarray(theta)
-    horiz = np.asarray(horiz)
+    theta = np.asarray(theta, dtype=float)
+    horiz = np.asarray(horiz, dtype=float)
 
     #project the horizon and azimuth onto the x-y plane
-    xp = [np.cos(np.radians(h)) * np.cos(np.radians(90 - t)) for (t, h) in zip(theta, horiz)]
-    yp = [np.cos(np.radians(h)) * np.sin(np.radians(90 - t)) for (t, h) in zip(theta, horiz)]
-
-    # Draw out the horizon line object (we will test for intersections later)
-    xy = np.array([[x,y] for (x,y) in zip(xp, yp)])
-    L = LinearRing(xy)  # horizon line
-
-    # Make on object for the origin
-    O = Point([0,0])
+    xp = np.cos(np.radians(horiz)) * np.cos(np.radians(90 - theta))
+    yp = np.cos(np.radians(horiz)) * np.sin(np.radians(90 - theta))
 
     # Test each point: does a ray extending from the origin through the point
     # intersect the horizon line once? twice?  If twice, is the point the nearest
     # or the farthest intersection?  This tells us whether or not its overhyng
-    ohang = []
+    counts, farthest = ray_ring_intersections(xp, yp)
+
+    if np.any(counts > 2):
+        warn("A single azimuth has 3 or more horizon intersections, This"+
+        "could be due to an overly complex horizon geometry and may lead"+
+        "to unexpected behaviour", RuntimeWarning)
+
+    # if there is another horizon line at a lower angle (distance ~ 1/angle)
+    pt_dist = np.hypot(xp, yp)
+    ohang = (pt_dist > 0) & (farthest > pt_dist + 1e-9)
+
+    if return_counts:
+        return ohang, counts
+
+    return(ohang)
+
+
+def ray_ring_intersections(x, y, length=2, block_size=2**20):
+    """ Intersect rays from the origin through each vertex of a ring with the ring
+
+    Parameters
+    ----------
+    x, y : array_like
+        coordinates of ring vertices. The ring is closed automatically.
+    length : float
+        length of each ray
+    block_size : int
+        approximate number of ray-segment pairs to test at a time
+
+    Returns
+    -------
+    tuple
+        (counts, farthest) arrays giving, for the ray through each vertex, the
+        number of distinct intersections with the ring and the distance to the
+        farthest intersection (-inf if none)
+
+    Examples
+    --------
+    >>> counts, farthest = ray_ring_intersections([1, 0, -1, 0], [0, 1, 0, -1])
+    >>> counts
+    array([1, 1, 1, 1])
+    >>> farthest
+    array([1., 1., 1., 1.])
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = x.size
+
+    # ray directions
+    r = np.hypot(x, y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ux = np.where(r > 0, x / r, 0)
+        uy = np.where(r > 0, y / r, 0)
 
-    for (x,y) in zip(xp, yp):
-        pt_dist =  O.distance(Point([x,y])) # get length of segment
+    # ring segments P -> P + d
+    dx = np.roll(x, -1) - x
+    dy = np.roll(y, -1) - y
 
-        # make line in direction of point that has length 2 (so its sure to hit all other pts)
-        l = LineString([[0,0], [x*(2/pt_dist),y*(2/pt_dist)]])
+    counts = np.zeros(n, dtype=int)
+    farthest = np.full(n, -np.inf)
+    rows = max(1, block_size // max(n, 1))
+    eps = 1e-12
 
-        # get intersection with horizon
-        pts = l.intersection(L)
-        if hasattr(pts, '__len__'): # for directions with more than one horizon value
-            if len(pts) > 2:
-                warn("A single azimuth has 3 or more horizon intersections, This"+
-                "could be due to an overly complex horizon geometry and may lead"+
-                "to unexpected behaviour", RuntimeWarning)
+    for start in range(0, n, rows):
+        bx = ux[start:start + rows, np.newaxis]
+        by = uy[start:start + rows, np.newaxis]
 
-            # if there is another horizon line at a lower angle
-            intersect_distances = [O.distance(x) for x in pts] #(distance ~ 1/angle)
+        # solve s * u = P + t * d for each ray and segment
+        denom = bx * dy - by * dx
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s = (x * dy - y * dx) / denom
+            t = (x * by - y * bx) / denom
 
-            if not max([pt_dist] + intersect_distances) == pt_dist:
-                ohang.append(True)
-            else:
-                ohang.append(False)
+        # half-open segments so shared vertices are only counted once
+        hit = ((denom != 0) & (s > eps) & (s <= length)
+               & (t >= -eps) & (t < 1 - eps))
 
-    # if only 1 intersection then not overhanging
-        else:
-            ohang.append(False)
+        counts[start:start + rows] = np.sum(hit, axis=1)
+        farthest[start:start + rows] = np.max(np.where(hit, s, -np.inf), axis=1)
 
-    return(np.array(ohang))
+    return counts, farthest
 
 
-def test_obscured(theta, horiz, increment):
+def test_obscured(theta, horiz, increment, block_size=2**20):
     """
     for a set of horizon points, detect which azimuth directions are completely
     overhung (i.e. x and (180 - x) both have 90 degree horizon angles)
@@ -584,6 +1190,8 @@ def test_obscured(theta, horiz, increment):
     Args:
         theta: array or list of azimuthal directions
         horiz: array or list of horizon angles for each theta
+        increment: spacing of test directions in degrees (may be fractional)
+        block_size: approximate number of direction-segment pairs to test at a time
 
     Returns:
         numpy array of logical values
@@ -595,30 +1203,30 @@ def test_obscured(theta, horiz, increment):
     #project the horizon and azimuth onto the x-y plane
     xp, yp = project_horizon_top_down(theta, horiz)
 
-    # Draw out the horizon line (we will test for intersections later)
-    xy = np.array([[x,y] for (x,y) in zip(xp, yp)])
-    L  = LinearRing(xy)  # horizon line
+    # horizon line segments (we will test for intersections later)
+    xq, yq = np.roll(xp, -1), np.roll(yp, -1)
 
-    obscured_points = []
+    # make test lines across the horizon, halfway around the circle
+    angles = np.arange(0, 180, increment)
+    ux = np.cos(np.radians(90 - angles))[:, np.newaxis]
+    uy = np.sin(np.radians(90 - angles))[:, np.newaxis]
 
-    # make test points halfway around the circle (
-    for angle in range(0,180, increment):
+    crossed = np.empty(angles.size, dtype=bool)
+    rows = max(1, block_size // max(xp.size, 1))
 
-        # make line across horizon
-        x_test = 2 * np.cos(np.radians(90 - angle))
-        y_test = 2 * np.sin(np.radians(90 - angle))
-        l = LineString([[x_test, y_test], [-x_test, -y_test]])
+    for start in range(0, angles.size, rows):
+        bx, by = ux[start:start + rows], uy[start:start + rows]
 
-        # get intersection with horizon
-        pts = l.intersection(L)
+        # a segment meets the line if its ends are on opposite sides (or touching)
+        side_p = bx * yp - by * xp
+        side_q = bx * yq - by * xq
+        crossed[start:start + rows] = np.any(side_p * side_q <= 0, axis=1)
 
-        if pts:
-            pass # intersects horizon at least once
-        else:
-            obscured_points.append(angle) # no intersection
-            obscured_points.append( (180 + angle) % 360)
+    # directions with no intersection are obscured on both sides
+    obscured = angles[~crossed]
+    obscured_points = np.column_stack((obscured, (180 + obscured) % 360)).ravel()
 
-    return(np.array(obscured_points))
+    return(obscured_points)
 
 
 if __name__ == "__main__":
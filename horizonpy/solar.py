@@ -0,0 +1,193 @@
+"""
+Solar position and direct-beam horizon shading.
+
+Sun positions follow the NOAA solar calculator equations (after Meeus,
+1991), evaluated for whole arrays of timestamps at once. They are accurate
+to about 0.01 degrees for dates between 1800 and 2100.
+
+Examples
+--------
+>>> import numpy as np
+>>> times = np.arange('2020-06-21T00:00', '2020-06-22T00:00', 60, dtype='datetime64[m]')
+>>> azimuth = np.arange(0, 360, 10)
+>>> shaded, cos_i = horizon_shading(times, 45, -75, azimuth, azimuth * 0 + 10)
+>>> int((~shaded).sum())  # hours of direct sun
+13
+"""
+import numpy as np
+
+from horizonpy.horizon import Horizon, HorizonTable
+from horizonpy.skyview import horiz_to_carte, rotate_towards
+
+
+def _julian_day(times):
+    """ Julian day (UT) of an array of timestamps """
+    if getattr(times, 'tz', None) is not None:  # timezone-aware pandas index
+        times = times.tz_convert('UTC').tz_localize(None)
+
+    times = np.asarray(times, dtype='datetime64[ns]')
+    days = (times - np.datetime64('1970-01-01T00:00:00', 'ns')) / np.timedelta64(1, 'D')
+
+    return days + 2440587.5
+
+
+def sun_position(times, latitude, longitude, refraction=True):
+    """ Solar azimuth and elevation for an array of timestamps
+
+    Parameters
+    ----------
+    times : array_like
+        timestamps in UTC as ``numpy.datetime64`` values or strings, or a
+        pandas DatetimeIndex (timezone-aware indexes are converted to UTC)
+    latitude : float
+        latitude in degrees, positive north
+    longitude : float
+        longitude in degrees, positive east
+    refraction : bool
+        whether to correct elevation for atmospheric refraction
+
+    Returns
+    -------
+    tuple
+        (azimuth, elevation) arrays in degrees. Azimuth is clockwise from north.
+
+    Examples
+    --------
+    >>> az, el = sun_position(['2020-03-20T12:00'], 0, 0)
+    >>> round(float(el[0]), 1)
+    88.2
+    """
+    jd = _julian_day(times)
+
+    # declination and equation of time change slowly; for long series evaluate
+    # them hourly and interpolate (error below 1e-5 degrees)
+    step = 1 / 24.
+    if jd.size > 2 and (np.ptp(jd) / step) < jd.size / 4:
+        nodes = np.arange(jd.min(), jd.max() + 2 * step, step)
+        declination, eq_time = _orbit(nodes)
+        declination = np.interp(jd, nodes, declination)
+        eq_time = np.interp(jd, nodes, eq_time)
+    else:
+        declination, eq_time = _orbit(jd)
+
+    minutes = ((jd - 0.5) % 1) * 1440  # UTC minutes since midnight
+    true_solar_time = (minutes + eq_time + 4 * longitude) % 1440
+    hour_angle = np.radians(true_solar_time / 4 - 180)
+
+    lat = np.radians(latitude)
+    cos_zenith = (np.sin(lat) * np.sin(declination) +
+                  np.cos(lat) * np.cos(declination) * np.cos(hour_angle))
+    elevation = np.degrees(np.arcsin(np.clip(cos_zenith, -1, 1)))
+
+    azimuth = np.degrees(np.arctan2(np.sin(hour_angle),
+                                    np.cos(hour_angle) * np.sin(lat) -
+                                    np.tan(declination) * np.cos(lat))) + 180
+
+    if refraction:
+        elevation = elevation + _refraction(elevation)
+
+    return azimuth % 360, elevation
+
+
+def _orbit(jd):
+    """ solar declination (radians) and equation of time (minutes) at julian days """
+    jc = (jd - 2451545) / 36525  # julian century
+
+    L = np.radians((280.46646 + jc * (36000.76983 + jc * 0.0003032)) % 360)  # mean longitude
+    M = np.radians(357.52911 + jc * (35999.05029 - 0.0001537 * jc))  # mean anomaly
+    e = 0.016708634 - jc * (0.000042037 + 0.0000001267 * jc)  # eccentricity
+
+    C = (np.sin(M) * (1.914602 - jc * (0.004817 + 0.000014 * jc)) +
+         np.sin(2 * M) * (0.019993 - 0.000101 * jc) +
+         np.sin(3 * M) * 0.000289)  # equation of centre
+
+    omega = np.radians(125.04 - 1934.136 * jc)
+    apparent_long = np.radians(np.degrees(L) + C - 0.00569 - 0.00478 * np.sin(omega))
+
+    mean_obliquity = 23 + (26 + (21.448 - jc * (46.815 + jc * (0.00059 - jc * 0.001813))) / 60) / 60
+    obliquity = np.radians(mean_obliquity + 0.00256 * np.cos(omega))
+
+    declination = np.arcsin(np.sin(obliquity) * np.sin(apparent_long))
+
+    y = np.tan(obliquity / 2) ** 2
+    eq_time = 4 * np.degrees(y * np.sin(2 * L) - 2 * e * np.sin(M) +
+                             4 * e * y * np.sin(M) * np.cos(2 * L) -
+                             0.5 * y * y * np.sin(4 * L) -
+                             1.25 * e * e * np.sin(2 * M))
+
+    return declination, eq_time
+
+
+def _refraction(elevation):
+    """ NOAA approximation of atmospheric refraction in degrees """
+    arcsec = np.zeros_like(elevation)
+
+    high = (elevation > 5) & (elevation <= 85)
+    te = np.tan(np.radians(elevation[high]))
+    arcsec[high] = 58.1 / te - 0.07 / te ** 3 + 0.000086 / te ** 5
+
+    low = (elevation > -0.575) & (elevation <= 5)
+    e = elevation[low]
+    arcsec[low] = 1735 + e * (-518.2 + e * (103.4 + e * (-12.79 + e * 0.711)))
+
+    below = elevation <= -0.575
+    arcsec[below] = -20.772 / np.tan(np.radians(elevation[below]))
+
+    return arcsec / 3600
+
+
+def horizon_shading(times, latitude, longitude, azimuth, horizon, aspect=0, dip=0,
+                    delta_phi=0.25, refraction=True):
+    """ Direct-beam shading mask and cosine of incidence for a time series
+
+    Terrain shading does not depend on the orientation of the surface: the
+    sun is compared to the horizon in the horizontal frame. For a tilted
+    surface, the sun is also shaded when it is behind the plane itself
+    (self-shading, ``cos_incidence <= 0``).
+
+    Parameters
+    ----------
+    times : array_like
+        timestamps in UTC (see :func:`sun_position`)
+    latitude : float
+        latitude in degrees, positive north
+    longitude : float
+        longitude in degrees, positive east
+    azimuth : array_like or Horizon
+        Array of azimuths in degrees, or a Horizon (``horizon`` is ignored)
+    horizon : array_like
+        Array of horizon angles in degrees
+    aspect : float
+        azimuth of plane
+    dip : float
+        inclination of plane in direction of aspect
+    delta_phi : float
+        azimuth spacing of the horizon lookup table in degrees
+    refraction : bool
+        whether to correct sun elevation for atmospheric refraction
+
+    Returns
+    -------
+    tuple
+        (shaded, cos_incidence) arrays. ``shaded`` is True when the sun is
+        below the horizon or behind the plane. ``cos_incidence`` is the cosine of the angle
+        between the sun and the plane normal, so that direct irradiance on
+        the surface is ``np.where(shaded, 0, cos_incidence) * beam``.
+    """
+    if isinstance(azimuth, Horizon):
+        azimuth, horizon = azimuth.azimuth, azimuth.horizon
+
+    sun_az, sun_el = sun_position(times, latitude, longitude, refraction)
+
+    table = HorizonTable(azimuth, horizon, delta_phi)
+    shaded = (sun_el <= 0) | (sun_el < table(sun_az))
+
+    if dip != 0:
+        # the sun's height above the plane, from the sun rotated into its frame
+        cos_incidence = np.dot(rotate_towards(aspect, -dip), horiz_to_carte(sun_az, sun_el))[2]
+        shaded |= cos_incidence <= 0
+
+    else:
+        cos_incidence = np.sin(np.radians(sun_el))
+
+    return shaded, cos_incidence
@@ -0,0 +1,306 @@
+import argparse
+import configparser
+import csv
+import glob
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from pandas import DataFrame, read_csv
+
+from horizonpy.horizon import Horizon
+from horizonpy.quickhorizon.geometry import calculate_true_azimuth
+from horizonpy.skyview import (SVF_discretized, rotate_horizon, svf_contour,
+                               svf_helbig_2009, svf_steyn_1980_analytic)
+
+HORIZON_SUFFIX = ".hpt.csv"
+AZIMUTH_SUFFIX = ".azm.ini"
+METHODS = ['steyn', 'helbig', 'discretized', 'contour']
+COLUMNS = ['station', 'aspect', 'dip', 'method', 'svf']
+
+
+def find_horizon_files(inputs):
+    """ Expand directories and glob patterns into a sorted list of .hpt.csv files """
+    files = set()
+
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*" + HORIZON_SUFFIX)
+
+        files.update(f for f in glob.glob(pattern) if f.endswith(HORIZON_SUFFIX))
+
+    return sorted(files)
+
+
+def station_name(horizon_file):
+    """ station identifier from a .hpt.csv file name """
+    return re.sub(re.escape(HORIZON_SUFFIX) + "$", "", os.path.basename(horizon_file))
+
+
+def duplicate_stations(horizon_files):
+    """ Station names shared by more than one file, with the files that share them """
+    files = dict()
+    for f in horizon_files:
+        files.setdefault(station_name(f), []).append(f)
+
+    return {name: paths for (name, paths) in files.items() if len(paths) > 1}
+
+
+def read_horizon_file(horizon_file):
+    """ Read azimuth and horizon angles from a QuickHorizon .hpt.csv file
+
+    If a sibling .azm.ini file with a field azimuth exists, true azimuths
+    are recalculated from the image azimuths.
+
+    Returns
+    -------
+    tuple
+        (azimuth, horizon) arrays in degrees
+    """
+    df = read_csv(horizon_file)
+    horizon = df['Horizon'].to_numpy(dtype=float)
+    azimuth = df['True Azimuth'].to_numpy(dtype=float)
+
+    ini = re.sub(re.escape(HORIZON_SUFFIX) + "$", AZIMUTH_SUFFIX, horizon_file)
+    if os.path.isfile(ini):
+        C = configparser.ConfigParser()
+        C.read(ini)
+        field_azimuth = C.getfloat("Azimuth", "field_azimuth", fallback=-1)
+
+        if field_azimuth != -1:
+            azimuth = np.array([calculate_true_azimuth(a, field_azimuth)
+                                for a in df['Image Azimuth']])
+
+    if np.any(azimuth == -1):
+        raise ValueError("No field azimuth defined for {}".format(horizon_file))
+
+    return azimuth, horizon
+
+
+def compute_svf(azimuth, horizon, aspect=0, dip=0, method='steyn', increment=2, annuli=72):
+    """ Calculate sky view factor for a surface using one of the available methods
+
+    Parameters
+    ----------
+    azimuth : array_like
+        Array of azimuths in degrees
+    horizon : array_like
+        Array of horizon angles in degrees
+    aspect : float
+        azimuth of plane
+    dip : float
+        inclination of plane in direction of aspect
+    method : str
+        one of 'steyn', 'helbig', 'discretized' or 'contour'. The 'helbig'
+        method only applies to horizontal surfaces.
+    increment : float
+        azimuth spacing for the 'helbig' and 'discretized' methods
+    annuli : int
+        number of annuli for the 'steyn' method
+
+    Returns
+    -------
+    float
+        Sky view factor between 0 and 1
+    """
+    if method == 'steyn':
+        rt = rotate_horizon(azimuth, horizon, aspect, dip, oob="ignore")
+        return svf_steyn_1980_analytic(rt[0], rt[1], annuli)
+
+    elif method == 'helbig':
+        if dip != 0:
+            raise ValueError("The 'helbig' method only applies to horizontal surfaces (dip = 0)")
+        return svf_helbig_2009(Horizon(azimuth, horizon), increment)
+
+    elif method == 'discretized':
+        return SVF_discretized(azimuth, horizon, aspect, dip, increment)
+
+    elif method == 'contour':
+        return svf_contour(azimuth, horizon, aspect, dip)
+
+    raise ValueError("Unknown sky view factor method: {}".format(method))
+
+
+def process_files(horizon_files, orientations, method='steyn', increment=2, annuli=72, cache=None):
+    """ Calculate sky view factor for every file and orientation
+
+    Runs in worker processes. Files that cannot be processed are logged and
+    skipped so they are retried on resume.
+
+    Returns
+    -------
+    list
+        rows of (station, aspect, dip, method, svf)
+    """
+    svf_cache = None
+    if cache:
+        from horizonpy.cache import SVFCache
+        svf_cache = SVFCache(cache)
+
+    rows = []
+    for f in horizon_files:
+        try:
+            azimuth, horizon = read_horizon_file(f)
+            for (aspect, dip) in orientations:
+                params = dict(aspect=aspect, dip=dip, method=method,
+                              increment=increment, annuli=annuli)
+                if svf_cache is not None:
+                    F_sky = svf_cache.get_or_compute('compute_svf', compute_svf,
+                                                     azimuth, horizon, **params)
+                else:
+                    F_sky = compute_svf(azimuth, horizon, **params)
+
+                rows.append((station_name(f), aspect, dip, method, float(F_sky)))
+
+        except Exception as e:
+            logging.error("Could not process {}: {}".format(f, e))
+
+    if svf_cache is not None:
+        svf_cache.close()
+
+    return rows
+
+
+class CSVResultWriter(object):
+    """ Stream result rows to a csv file """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.done = self.finished_stations() if resume else set()
+        new = not (resume and os.path.isfile(path))
+        self._file = open(path, 'w' if new else 'a', newline='')
+        self._writer = csv.writer(self._file)
+        if new:
+            self._writer.writerow(COLUMNS)
+
+    def finished_stations(self):
+        if not os.path.isfile(self.path):
+            return set()
+        return set(read_csv(self.path, usecols=['station'], dtype=str)['station'])
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetResultWriter(object):
+    """ Stream result rows to a parquet file (requires pyarrow) """
+
+    def __init__(self, path, resume=False):
+        import pyarrow
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self._pa = pyarrow
+        self._tmp = path + ".tmp"
+        self.done = set()
+        self._schema = pyarrow.schema([('station', pyarrow.string()),
+                                       ('aspect', pyarrow.float64()),
+                                       ('dip', pyarrow.float64()),
+                                       ('method', pyarrow.string()),
+                                       ('svf', pyarrow.float64())])
+        self._writer = pq.ParquetWriter(self._tmp, self._schema)
+
+        # parquet files cannot be appended to: copy finished rows to the new file
+        if resume and os.path.isfile(path):
+            previous = pq.read_table(path, schema=self._schema)
+            self._writer.write_table(previous)
+            self.done = set(previous.column('station').to_pylist())
+
+    def write(self, rows):
+        if rows:
+            df = DataFrame(rows, columns=COLUMNS)
+            self._writer.write_table(self._pa.Table.from_pandas(df, schema=self._schema,
+                                                                preserve_index=False))
+
+    def close(self):
+        self._writer.close()
+        os.replace(self._tmp, self.path)
+
+
+def chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def orientation(text):
+    """ parse an 'ASPECT,DIP' command line argument """
+    try:
+        aspect, dip = (float(x) for x in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("orientation must be given as ASPECT,DIP")
+    return (aspect, dip)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Calculate sky view factors for directories of QuickHorizon .hpt.csv files",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('inputs', nargs='*', help="Directories or glob patterns of .hpt.csv files")
+    parser.add_argument('--out', type=str, default="svf.csv", help="Output file (.csv or .parquet)")
+    parser.add_argument('--orientation', type=orientation, action='append', dest='orientations',
+                        metavar="ASPECT,DIP", help="Surface orientation. May be repeated. Default is 0,0")
+    parser.add_argument('--method', choices=METHODS, default='steyn', help="Sky view factor method")
+    parser.add_argument('--increment', type=float, default=2, help="Azimuth increment for helbig and discretized methods")
+    parser.add_argument('--annuli', type=int, default=72, help="Number of annuli for steyn method")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument('--chunk-size', type=int, default=8, help="Number of files sent to a worker at a time")
+    parser.add_argument('--resume', action='store_true', help="Skip stations already present in the output file")
+    parser.add_argument('--cache', type=str, default=None, help="Path to an optional sky view factor cache database")
+
+    args = parser.parse_args()
+
+    if len(sys.argv) == 1:
+        parser.print_help(sys.stderr)
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)-8s %(message)s')
+
+    orientations = args.orientations or [(0., 0.)]
+    if args.method == 'helbig' and any(dip != 0 for (aspect, dip) in orientations):
+        parser.error("--method helbig only applies to horizontal surfaces; "
+                     "use another method for orientations with a nonzero dip")
+
+    # stations are identified by file name in the output and on resume
+    horizon_files = find_horizon_files(args.inputs)
+    duplicates = duplicate_stations(horizon_files)
+    if duplicates:
+        parser.error("station names must be unique, but these files share a name: {}".format(
+            "; ".join(", ".join(paths) for paths in duplicates.values())))
+
+    if args.out.endswith(".parquet"):
+        writer = ParquetResultWriter(args.out, args.resume)
+    else:
+        writer = CSVResultWriter(args.out, args.resume)
+
+    files = [f for f in horizon_files if station_name(f) not in writer.done]
+    logging.info("Processing {} horizon files ({} already finished)".format(len(files), len(writer.done)))
+
+    options = dict(orientations=orientations, method=args.method, increment=args.increment,
+                   annuli=args.annuli, cache=args.cache)
+
+    try:
+        if args.jobs <= 1:
+            for chunk in chunks(files, args.chunk_size):
+                writer.write(process_files(chunk, **options))
+        else:
+            with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+                futures = [executor.submit(process_files, chunk, **options)
+                           for chunk in chunks(files, args.chunk_size)]
+                for future in as_completed(futures):
+                    writer.write(future.result())
+    finally:
+        writer.close()
+
+    logging.info("Results written to {}".format(args.out))
+
+
+if __name__ == "__main__":
+    main()
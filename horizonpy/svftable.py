@@ -0,0 +1,257 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from horizonpy.horizon import Horizon
+from horizonpy.skyview import SVF_discretized, svf_contour, svf_orientations
+
+METHODS = ['contour', 'discretized', 'orientations']
+
+
+def _svf_row(azimuth, horizon, aspects, dip, method, increment):
+    """ sky view factor for every aspect at one dip (runs in worker processes) """
+    if method == 'contour':
+        return [svf_contour(azimuth, horizon, a, dip) for a in aspects]
+
+    elif method == 'discretized':
+        return [SVF_discretized(azimuth, horizon, a, dip, increment) for a in aspects]
+
+    elif method == 'orientations':
+        return svf_orientations(azimuth, horizon, aspects, np.full(len(aspects), dip))
+
+    raise ValueError("Unknown sky view factor method: {}".format(method))
+
+
+class SVFTable(object):
+    """
+    Sky view factor precomputed on a regular aspect x dip grid.
+
+    Values are stored as float32 and queried by bilinear interpolation,
+    periodic in aspect. Each query can report a bound on the interpolation
+    error, estimated from second differences of the surrounding grid cells.
+
+    Parameters
+    ----------
+    aspect : array_like
+        evenly spaced aspects in degrees covering [0, 360), starting at 0
+    dip : array_like
+        evenly spaced, increasing dips in degrees
+    svf : array_like
+        (len(dip), len(aspect)) array of sky view factors
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> az = np.arange(0, 360, 10)
+    >>> T = SVFTable.compute(az, az * 0, d_aspect=30, d_dip=15, jobs=1)
+    >>> T.svf.shape
+    (7, 12)
+    >>> round(float(T(45, 0)), 5)
+    1.0
+    """
+
+    def __init__(self, aspect, dip, svf):
+        self.aspect = np.asarray(aspect, dtype=float)
+        self.dip = np.asarray(dip, dtype=float)
+        self.svf = np.asarray(svf, dtype=np.float32)
+
+        if self.svf.shape != (self.dip.size, self.aspect.size):
+            raise ValueError("svf must have shape (len(dip), len(aspect))")
+
+        self.d_aspect = 360. / self.aspect.size
+        self.d_dip = self.dip[1] - self.dip[0] if self.dip.size > 1 else 1.
+
+        if not (np.allclose(self.aspect, np.arange(self.aspect.size) * self.d_aspect) and
+                np.allclose(np.diff(self.dip), self.d_dip)):
+            raise ValueError("aspect and dip must be evenly spaced and aspect must cover [0, 360)")
+
+        self._error = None
+
+    @classmethod
+    def compute(cls, azimuth, horizon=None, d_aspect=5, d_dip=5, max_dip=90,
+                method='contour', increment=2, jobs=None):
+        """ Calculate sky view factor over an aspect x dip grid
+
+        Parameters
+        ----------
+        azimuth : array_like or Horizon
+            Array of azimuths in degrees, or a Horizon (``horizon`` omitted)
+        horizon : array_like
+            Array of horizon angles in degrees
+        d_aspect : float
+            aspect spacing in degrees. Must divide 360.
+        d_dip : float
+            dip spacing in degrees
+        max_dip : float
+            largest dip in the table
+        method : str
+            'contour' (exact, default), 'discretized' (``SVF_discretized``) or
+            'orientations' (``svf_orientations``, the exact contour method
+            vectorized over all aspects of a dip)
+        increment : float
+            azimuth increment for the 'discretized' method
+        jobs : int, optional
+            number of worker processes. One row of dips is computed per task.
+            If 1, everything is computed in this process.
+
+        Returns
+        -------
+        SVFTable
+        """
+        if method not in METHODS:
+            raise ValueError("Unknown sky view factor method: {}".format(method))
+
+        if isinstance(azimuth, Horizon):
+            azimuth, horizon = azimuth.azimuth, azimuth.horizon
+
+        azimuth = np.asarray(azimuth, dtype=float)
+        horizon = np.asarray(horizon, dtype=float)
+
+        n_aspect = int(round(360. / d_aspect))
+        if not np.isclose(n_aspect * d_aspect, 360):
+            raise ValueError("d_aspect must divide 360")
+
+        aspect = np.arange(n_aspect) * (360. / n_aspect)
+        dip = np.arange(0, max_dip + d_dip / 2, d_dip)
+
+        if jobs == 1 or method == 'orientations':
+            rows = [_svf_row(azimuth, horizon, aspect, d, method, increment) for d in dip]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(_svf_row, azimuth, horizon, aspect, d, method, increment)
+                           for d in dip]
+                rows = [f.result() for f in futures]
+
+        return cls(aspect, dip, np.array(rows))
+
+    def _cells(self, aspect, dip):
+        """ lower grid indices and fractional offsets of each query point """
+        aspect = np.asarray(aspect, dtype=float)
+        dip = np.asarray(dip, dtype=float)
+
+        if np.any((dip < self.dip[0] - 1e-9) | (dip > self.dip[-1] + 1e-9)):
+            raise ValueError("dip outside of table range [{}, {}]".format(self.dip[0], self.dip[-1]))
+
+        u = (aspect % 360) / self.d_aspect
+        i = np.floor(u).astype(int) % self.aspect.size
+        u = u - np.floor(u)
+
+        v = (dip - self.dip[0]) / self.d_dip
+        j = np.clip(np.floor(v).astype(int), 0, max(self.dip.size - 2, 0))
+        v = np.clip(v - j, 0, 1)
+
+        return i, j, u, v
+
+    def __call__(self, aspect, dip, return_error=False):
+        """ Interpolate sky view factor at arbitrary orientations
+
+        Parameters
+        ----------
+        aspect : array_like
+            azimuths of planes in degrees
+        dip : array_like
+            inclinations of planes in degrees, within the table range
+        return_error : bool
+            whether to also return a bound on the interpolation error
+
+        Returns
+        -------
+        array or tuple
+            interpolated sky view factor, and if ``return_error`` is True,
+            the estimated maximum absolute interpolation error
+        """
+        i, j, u, v = self._cells(aspect, dip)
+        i1 = (i + 1) % self.aspect.size
+        j1 = np.minimum(j + 1, self.dip.size - 1)
+
+        S = self.svf.astype(float)
+        F = ((1 - u) * (1 - v) * S[j, i] + u * (1 - v) * S[j, i1] +
+             (1 - u) * v * S[j1, i] + u * v * S[j1, i1])
+
+        if return_error:
+            return F, self.error[j, i]
+
+        return F
+
+    @property
+    def error(self):
+        """ (len(dip), len(aspect)) error bound for each grid cell
+
+        The bilinear interpolation error in a cell is at most
+        (h_a^2 |f_aa| + h_d^2 |f_dd|) / 8, where the second derivatives are
+        estimated by the largest second difference at the cell corners. A
+        safety factor of 2 covers the error of that estimate, which is
+        largest near dip 0 where the grid converges on the pole. The float32
+        storage error is added.
+        """
+        if self._error is None:
+            S = self.svf.astype(float)
+
+            d2a = np.abs(np.roll(S, -1, axis=1) - 2 * S + np.roll(S, 1, axis=1))
+
+            d2d = np.zeros_like(S)
+            if S.shape[0] > 2:
+                d2d[1:-1] = np.abs(S[2:] - 2 * S[1:-1] + S[:-2])
+                d2d[0], d2d[-1] = d2d[1], d2d[-2]
+
+            corner = d2a + d2d
+            corner = np.maximum(corner, np.roll(corner, -1, axis=1))
+            corner[:-1] = np.maximum(corner[:-1], corner[1:])
+
+            self._error = corner / 4 + np.finfo(np.float32).eps
+
+        return self._error
+
+    def optimize(self, kind='max', refine=None):
+        """ Orientation with the largest or smallest sky view factor
+
+        Parameters
+        ----------
+        kind : str
+            'max' or 'min'
+        refine : callable, optional
+            function ``refine(aspect, dip)`` returning the exact sky view
+            factor, e.g. ``lambda a, d: svf_contour(az, hor, a, d)``. If
+            given, the grid optimum is refined with a Nelder-Mead search
+            within the table bounds.
+
+        Returns
+        -------
+        tuple
+            (aspect, dip, svf)
+        """
+        if kind not in ('max', 'min'):
+            raise ValueError("kind must be 'max' or 'min'")
+
+        sign = -1 if kind == 'max' else 1
+        j, i = np.unravel_index(np.argmin(sign * self.svf), self.svf.shape)
+        aspect, dip, F = self.aspect[i], self.dip[j], float(self.svf[j, i])
+
+        if refine is None:
+            return aspect, dip, F
+
+        from scipy.optimize import minimize
+
+        bounds = ((aspect - self.d_aspect, aspect + self.d_aspect),
+                  (max(dip - self.d_dip, self.dip[0]), min(dip + self.d_dip, self.dip[-1])))
+        result = minimize(lambda x: sign * refine(x[0], x[1]), (aspect, dip),
+                          method='Nelder-Mead', bounds=bounds)
+
+        if result.fun < sign * F:
+            aspect, dip, F = result.x[0] % 360, result.x[1], sign * float(result.fun)
+
+        return aspect, dip, F
+
+    def save(self, path):
+        """ Save table to a compressed .npz file """
+        np.savez_compressed(path, aspect=self.aspect, dip=self.dip, svf=self.svf)
+
+    @classmethod
+    def load(cls, path):
+        """ Load a table written by :meth:`save` """
+        with np.load(path) as data:
+            return cls(data['aspect'], data['dip'], data['svf'])
+
+    def __repr__(self):
+        return "SVFTable(aspect={}x{:g}, dip={:g}..{:g})".format(
+            self.aspect.size, self.d_aspect, self.dip[0], self.dip[-1])
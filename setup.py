@@ -12,7 +12,8 @@ setup(name='horizonpy',
       package_data={'horizonpy': ['SampleHorizonImages']},
       entry_points={
             'console_scripts': ['quickhorizon = horizonpy.quickhorizon.main:main',
-                                'arcsky = horizonpy.arcsky:main']
+                                'arcsky = horizonpy.arcsky:main',
+                                'svfbatch = horizonpy.svfbatch:main']
       },
       install_requires=['numpy',
                         'pandas',
@@ -1,14 +1,49 @@
 
 import unittest
 
+from PIL import Image, ImageEnhance
+
+from horizonpy.quickhorizon.View import MainView
+
 # https://stackoverflow.com/questions/4083796/how-do-i-run-unittest-on-a-tkinter-app
 
 class ImageLoad(unittest.TestCase):
     pass
 
 
+class Enhancement(unittest.TestCase):
+
+    def setUp(self):
+        # no Tk window is needed to enhance images
+        self.view = MainView.__new__(MainView)
+        self.image = Image.new('RGB', (4, 4), (100, 50, 20))
+
+    def test_unit_factor_is_skipped(self):
+        result = self.view.apply_enhancement(self.image, ImageEnhance.Contrast, 1.0)
+        self.assertIs(result, self.image)
+
+    def test_brightness(self):
+        result = self.view.apply_enhancement(self.image, ImageEnhance.Brightness, 1.1)
+        self.assertEqual(result.getpixel((0, 0)), (110, 55, 22))
+
+    def test_contrast(self):
+        result = self.view.apply_enhancement(self.image, ImageEnhance.Contrast, 1.1)
+        self.assertEqual(result.size, self.image.size)
+        self.assertIsNot(result, self.image)
+
+    def test_integer_image_unchanged(self):
+        image = Image.new('I', (4, 4), 1000)
+        result = self.view.apply_enhancement(image, ImageEnhance.Brightness, 1.1)
+        self.assertIs(result, image)
+
+    def test_setters(self):
+        self.view._contrast_value = self.view._brightness_value = 1
+        with self.assertLogs(level='INFO') as logs:
+            self.view.contrast_value = 1.2
+            self.view.brightness_value = 0.9
+        self.assertEqual((self.view.contrast_value, self.view.brightness_value), (1.2, 0.9))
+        self.assertIn('from 1.00 to 1.20', logs.output[0])
 
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
-
@@ -0,0 +1,312 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from horizonpy.arcsky import (ArcSky, HorizonCache, convert_bands, convert_rasters, find_rasters,
+                              iter_bands, iter_horizons, pixel_weights, radial_scan, read_raster,
+                              read_geotransform, _split_bands)
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), "..", "Examples", "Example_1", "ArcGIS_Skymap.tif")
+
+
+def skymap(size=201, horizon=30):
+    """ synthetic skymap with a uniform horizon: 2 = sky, 1 = ground, 0 = outside """
+    yy, xx = np.mgrid[0:size, 0:size] + 0.5
+    r = np.hypot(xx - size / 2, yy - size / 2)
+    data = np.where(r < size / 2, 1, 0).astype(np.int32)
+    data[r < (size / 2) * (1 - horizon / 90)] = 2
+    return data, r
+
+
+def save_geotiff(path, data):
+    """ save a north-up GeoTIFF with tiepoint (0, 0) -> (0, rows) and unit pixels, like EXAMPLE """
+    from PIL import TiffImagePlugin
+    info = TiffImagePlugin.ImageFileDirectory_v2()
+    info[33550] = (1.0, 1.0, 0.0)
+    info[33922] = (0.0, 0.0, 0.0, 0.0, float(data.shape[0]), 0.0)
+    info.tagtype[33550] = info.tagtype[33922] = 12  # double
+    Image.fromarray(data).save(path, tiffinfo=info)
+
+
+class TestRadialScan(unittest.TestCase):
+
+    def test_uniform_horizon(self):
+        data, r = skymap()
+        angle, R, Rmax = radial_scan(data == 2, n_azimuth=360)
+        theta_h = 90 * (1 - R / Rmax)
+        np.testing.assert_allclose(theta_h, 30, atol=1)
+
+    def test_hole_and_patch(self):
+        data, r = skymap()
+        sky = data == 2
+        sky[95:105, 140:150] = False  # obstruction inside the sky at angle 0
+        sky[95:105, 180:190] = True  # separate sky patch beyond the horizon
+
+        _, R_outer, _ = radial_scan(sky, n_azimuth=4, mode='outer')
+        _, R_inner, _ = radial_scan(sky, n_azimuth=4, mode='inner')
+
+        self.assertAlmostEqual(R_outer[0], 89.5, delta=0.5)
+        self.assertAlmostEqual(R_inner[0], 39.5, delta=0.5)
+        np.testing.assert_allclose(R_outer[1:], R_inner[1:])
+
+    def test_no_sky(self):
+        _, R, _ = radial_scan(np.zeros((10, 10), dtype=bool), n_azimuth=8)
+        np.testing.assert_array_equal(R, 0)
+
+
+class TestArcSkyNumpy(unittest.TestCase):
+
+    def test_synthetic_raster(self):
+        data, r = skymap()
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "sky.tif")
+            Image.fromarray(data).save(path)
+            np.testing.assert_array_equal(read_raster(path), data)
+
+            A = ArcSky(backend='numpy')
+            A.setSkyClassValue(2)
+            self.assertTrue(A.open_new_file(path))
+
+        np.testing.assert_allclose(A.interpolate_horizon(10)['horizon_ele_deg'], 30, atol=1)
+        self.assertEqual(len(A.points()), A.n_azimuth)
+
+    def test_example(self):
+        A = ArcSky(backend='numpy')
+        A.setSkyClassValue(200)
+        A.open_new_file(EXAMPLE)
+        h = A.profile.horizon
+        self.assertTrue(np.all((h >= 0) & (h <= 90)))
+
+    def test_pixel_svf(self):
+        data, r = skymap(size=601)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "sky.tif")
+            Image.fromarray(data).save(path)
+            A = ArcSky(backend='numpy')
+            A.setSkyClassValue(2)
+            F = A.sky_view_factor(path)
+        self.assertAlmostEqual(F, np.cos(np.radians(30)) ** 2, places=3)
+
+    def test_pixel_svf_matches_horizon(self):
+        from horizonpy.skyview import svf_helbig_2009
+        A = ArcSky(backend='numpy')
+        A.setSkyClassValue(200)
+        A.open_new_file(EXAMPLE)
+        self.assertAlmostEqual(A.sky_view_factor(), svf_helbig_2009(A.profile, 0.25), places=3)
+
+    def test_pixel_weights_cached(self):
+        self.assertIs(pixel_weights((50, 50)), pixel_weights((50, 50)))
+        self.assertAlmostEqual(float(pixel_weights((50, 50)).sum()), 1)
+
+    def test_calculate_horizon(self):
+        A = ArcSky(backend='numpy')
+        A.centroid = (100., 100.)
+        A.raw_points = [(150., 100.), (100., 160.), (50., 100.), (100., 40.)]
+        A.calculate_horizon()
+        np.testing.assert_allclose(A.profile.azimuth, [0, 90, 180, 270])
+        np.testing.assert_allclose(A.profile.horizon, [45, 36, 45, 36])
+
+    def test_multiple_resolutions(self):
+        A = ArcSky(backend='numpy')
+        A.setSkyClassValue(200)
+        A.open_new_file(EXAMPLE)
+        tables = A.interpolate_horizon([1, 2, 5])
+        self.assertEqual(sorted(tables), [1, 2, 5])
+        self.assertEqual([len(tables[d]) for d in [1, 2, 5]], [360, 180, 72])
+        np.testing.assert_array_equal(tables[2].values, A.interpolate_horizon(2).values)
+
+        with tempfile.TemporaryDirectory() as d:
+            files = A.write_horizon_file(os.path.join(d, "h.csv"), [1, 5])
+            self.assertEqual([os.path.basename(f) for f in files], ["h_1deg.csv", "h_5deg.csv"])
+            self.assertTrue(all(os.path.isfile(f) for f in files))
+
+    def test_geotransform(self):
+        self.assertEqual(read_geotransform(EXAMPLE), (0., 1., 0., 1001., 0., -1.))
+
+    def test_georeferenced_parity(self):
+        # obstruction in the top right of the image, i.e. north-east in map coordinates
+        data, r = skymap(size=301, horizon=30)
+        yy, xx = np.mgrid[0:301, 0:301] + 0.5
+        ne = (xx > 150.5) & (yy < 150.5) & (r > 150.5 * (1 - 60 / 90.)) & (r < 150.5)
+        data[ne] = 1
+
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "sky.tif")
+            save_geotiff(path, data)
+            A = ArcSky(backend='numpy')
+            A.setSkyClassValue(2)
+            A.open_new_file(path)
+
+        # outline as GDAL Polygonize writes it: x = col, y = rows - row
+        angle, R, Rmax = radial_scan(data == 2, n_azimuth=1440)
+        a = np.radians(angle)
+        B = ArcSky(backend='numpy')
+        B.centroid = (150.5, 301 - 150.5)
+        B.raw_points = list(zip(150.5 + R * np.cos(a), 301 - (150.5 + R * np.sin(a))))
+        B.calculate_horizon()
+
+        hA = A.interpolate_horizon(5)['horizon_ele_deg'].values
+        hB = B.interpolate_horizon(5)['horizon_ele_deg'].values
+        np.testing.assert_allclose(hA, hB, atol=0.5)
+        np.testing.assert_allclose(A.profile.horizon[(A.profile.azimuth > 10) & (A.profile.azimuth < 80)], 60, atol=1)
+        np.testing.assert_allclose(A.profile.horizon[(A.profile.azimuth > 280) & (A.profile.azimuth < 350)], 30, atol=1)
+        np.testing.assert_allclose(A.centroid, B.centroid)
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ValueError):
+            ArcSky(backend='foo')
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.stack = os.path.join(self.tmp.name, "stack.tif")
+        frames = [Image.fromarray(skymap(horizon=h)[0]) for h in [10, 20, 30]]
+        frames[0].save(self.stack, save_all=True, append_images=frames[1:])
+        Image.fromarray(skymap(horizon=45)[0]).save(os.path.join(self.tmp.name, "single.tif"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_iter_bands(self):
+        bands = iter_bands(self.stack)
+        i, name, data = next(bands)
+        self.assertEqual((i, data.shape), (1, (201, 201)))
+        self.assertEqual([b[0] for b in bands], [2, 3])
+
+    def test_more_bands_than_columns(self):
+        data = np.arange(3 * 2 * 4, dtype=np.uint8).reshape(3, 2, 4)
+        path = os.path.join(self.tmp.name, "narrow.png")
+        Image.fromarray(data, 'RGBA').save(path)
+
+        np.testing.assert_array_equal(read_raster(path), data[..., 0])
+        bands = [band for (i, name, band) in iter_bands(path)]
+        self.assertEqual(len(bands), 4)
+        for k in range(4):
+            np.testing.assert_array_equal(bands[k], data[..., k])
+
+    def test_split_bands_axes(self):
+        planar = np.arange(5 * 3 * 2).reshape(5, 3, 2)
+        for axes in ['SYX', 'IYX']:
+            bands = list(_split_bands(planar, axes))
+            self.assertEqual(len(bands), 5)
+            np.testing.assert_array_equal(bands[4], planar[4])
+
+        bands = list(_split_bands(planar, 'YXS'))
+        self.assertEqual(len(bands), 2)
+        np.testing.assert_array_equal(bands[1], planar[..., 1])
+
+        pages = np.arange(2 * 3 * 4 * 3).reshape(2, 3, 4, 3)
+        bands = list(_split_bands(pages, 'IYXS'))
+        self.assertEqual(len(bands), 6)
+        np.testing.assert_array_equal(bands[4], pages[1, ..., 1])
+
+    def test_iter_horizons(self):
+        stations = iter_horizons([self.tmp.name], sky_value=2, n_azimuth=360)
+        result = {name: float(np.mean(H.horizon)) for (name, H) in stations}
+        self.assertEqual(sorted(result), ["single", "stack_1", "stack_2", "stack_3"])
+        for (name, h) in [("stack_1", 10), ("stack_2", 20), ("stack_3", 30), ("single", 45)]:
+            self.assertAlmostEqual(result[name], h, delta=1)
+
+    def test_convert_bands(self):
+        out = os.path.join(self.tmp.name, "out")
+        summary = convert_bands([self.stack], out, sky_value=2, delta_phi=[2, 5])
+        self.assertEqual(list(summary['raster']), ["stack_1", "stack_2", "stack_3"])
+        self.assertTrue(os.path.isfile(os.path.join(out, "stack_3_5deg.csv")))
+
+
+class TestHorizonCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.raster = os.path.join(self.tmp.name, "sky.tif")
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        Image.fromarray(skymap(horizon=30)[0]).save(self.raster)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def convert(self, sky_value=2):
+        A = ArcSky(backend='numpy', cache_dir=self.cache_dir)
+        A.setSkyClassValue(sky_value)
+        A.open_new_file(self.raster)
+        return A
+
+    def test_hit(self):
+        A1 = self.convert()
+        self.assertEqual(len(A1.cache), 1)
+
+        A2 = self.convert()
+        self.assertEqual(len(A2.cache), 1)
+        np.testing.assert_array_equal(A1.profile.horizon, A2.profile.horizon)
+        self.assertEqual(A1.centroid, A2.centroid)
+        self.assertEqual(len(A1.raw_points), len(A2.raw_points))
+
+    def test_invalidation(self):
+        self.convert()
+        self.convert(sky_value=1)
+        self.assertEqual(len(HorizonCache(self.cache_dir)), 2)
+
+        Image.fromarray(skymap(horizon=10)[0]).save(self.raster)
+        os.utime(self.raster, ns=(0, 0))
+        A = self.convert()
+        self.assertEqual(len(A.cache), 3)
+        self.assertAlmostEqual(float(np.mean(A.profile.horizon)), 10, delta=1)
+
+        A.cache.clear()
+        self.assertEqual(len(A.cache), 0)
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_convert_rasters(self):
+        data, r = skymap()
+        with tempfile.TemporaryDirectory() as d:
+            for name in ["a.tif", "b.tif"]:
+                Image.fromarray(data).save(os.path.join(d, name))
+            with open(os.path.join(d, "bad.tif"), 'w') as f:
+                f.write("not a raster")
+            with open(os.path.join(d, "notes.txt"), 'w') as f:
+                f.write("not a raster either")
+
+            files = find_rasters([d])
+            self.assertEqual([os.path.basename(f) for f in files], ["a.tif", "b.tif", "bad.tif"])
+
+            summary = convert_rasters(files, os.path.join(d, "out"), jobs=2,
+                                      sky_value=2, backend='numpy')
+
+            self.assertEqual(list(summary['error'].isna()), [True, True, False])
+            self.assertTrue(os.path.isfile(os.path.join(d, "out", "a.csv")))
+            np.testing.assert_allclose(summary['svf'][:2], np.cos(np.radians(30)) ** 2, atol=0.02)
+
+            summary = convert_rasters(files[:1], sky_value=2, svf_only=True)
+            self.assertIsNone(summary['output'][0])
+            self.assertAlmostEqual(summary['svf'][0], np.cos(np.radians(30)) ** 2, delta=0.01)
+
+    def test_single_file_options_rejected(self):
+        import sys
+        from unittest import mock
+        from horizonpy import arcsky
+        for option in ['--out', '--vector-file']:
+            argv = ['arcsky', os.path.dirname(EXAMPLE), option, 'x.csv']
+            with mock.patch.object(sys, 'argv', argv), self.assertRaises(SystemExit):
+                arcsky.main()
+
+    def test_batch_options_rejected(self):
+        import sys
+        from unittest import mock
+        from horizonpy import arcsky
+        options = [['--svf-only'], ['--summary', 'x.csv'], ['--bands'], ['--jobs', '2'],
+                   ['--out-dir', 'x']]
+        for option in options:
+            for argv in [['arcsky', '--sky', EXAMPLE] + option, ['arcsky'] + option]:
+                with mock.patch.object(sys, 'argv', argv), self.assertRaises(SystemExit):
+                    arcsky.main()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+import numpy as np
+
+from benchmarks import synthetic
+from benchmarks.bench_skyview import run
+
+
+class TestSyntheticHorizons(unittest.TestCase):
+
+    def test_seeded(self):
+        for (name, generator) in synthetic.GENERATORS.items():
+            a1, h1 = generator(200)
+            a2, h2 = generator(200)
+            np.testing.assert_array_equal(h1, h2, err_msg=name)
+            self.assertEqual(a1.shape, h1.shape)
+
+    def test_range(self):
+        for (name, generator) in synthetic.GENERATORS.items():
+            azimuth, horizon = generator(500)
+            self.assertTrue(np.all((azimuth >= 0) & (azimuth < 360)), name)
+            self.assertTrue(np.all((horizon >= 0) & (horizon <= 180)), name)
+
+
+class TestBenchmarkRunner(unittest.TestCase):
+
+    def test_quick_run(self):
+        results = run("svf_contour|svf_helbig_2009$", quick=True, repeat=1,
+                      min_time=0, verbose=False)
+        self.assertEqual(set(r['name'] for r in results), {'svf_contour', 'svf_helbig_2009'})
+        for r in results:
+            self.assertGreater(r['best'], 0)
+            self.assertGreaterEqual(r['peak_memory'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from horizonpy.cache import SVFCache
+from horizonpy.skyview import SVF_discretized, rotate_horizon
+
+
+class TestSVFCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "svf.sqlite")
+        self.azimuth = np.arange(0, 360, 10.)
+        self.horizon = 20 + 10 * np.sin(np.radians(2 * self.azimuth))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_persistent(self):
+        with SVFCache(self.path) as cache:
+            F = cache.svf(self.azimuth, self.horizon, aspect=130, dip=35, increment=2)
+            self.assertEqual(F, SVF_discretized(self.azimuth, self.horizon, 130, 35, 2))
+
+        with SVFCache(self.path) as cache:
+            self.assertEqual(cache.svf(self.azimuth, self.horizon, aspect=130, dip=35, increment=2), F)
+            self.assertEqual(cache.stats()['hits'], 1)
+            self.assertEqual(cache.stats()['misses'], 0)
+
+    def test_parameters_in_key(self):
+        with SVFCache(self.path) as cache:
+            cache.svf(self.azimuth, self.horizon, 'svf_steyn_1980', n=18)
+            cache.svf(self.azimuth, self.horizon, 'svf_steyn_1980', n=36)
+            cache.svf(self.azimuth, self.horizon, 'svf_steyn_1980', n=36.)
+            self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_rotated_horizon(self):
+        with SVFCache(self.path) as cache:
+            rt = cache.rotate_horizon(self.azimuth, self.horizon, 135, 30)
+            rt = cache.rotate_horizon(self.azimuth, self.horizon, 135, 30)
+            np.testing.assert_array_equal(rt, rotate_horizon(self.azimuth, self.horizon, 135, 30))
+            self.assertEqual(cache.hits, 1)
+
+    def test_lru_eviction(self):
+        with SVFCache(self.path, max_size=1000) as cache:
+            for n in range(10, 20):
+                cache.svf(self.azimuth, self.horizon, 'svf_steyn_1980_analytic', n=n)
+            self.assertLessEqual(cache.size(), 1000)
+            self.assertLess(len(cache), 10)
+
+            # most recent entry is kept
+            cache.svf(self.azimuth, self.horizon, 'svf_steyn_1980_analytic', n=19)
+            self.assertEqual(cache.hits, 1)
+
+    def test_hits_update_lru_order(self):
+        with SVFCache(self.path, flush_every=10**6) as cache:
+            for n in (10, 11):
+                cache.svf(self.azimuth, self.horizon, 'svf_steyn_1980_analytic', n=n)
+            cache.svf(self.azimuth, self.horizon, 'svf_steyn_1980_analytic', n=10)
+
+        with SVFCache(self.path) as cache:
+            cache.max_size = cache.size()  # evict one entry on the next insert
+            cache.svf(self.azimuth, self.horizon, 'svf_steyn_1980_analytic', n=12)
+            cache.svf(self.azimuth, self.horizon, 'svf_steyn_1980_analytic', n=10)
+            self.assertEqual(cache.hits, 1)
+
+    def test_method_version_in_key(self):
+        from horizonpy import cache as cache_module
+        key = SVFCache.make_key('svf_contour', self.azimuth, self.horizon, dip=10)
+        versions = dict(cache_module.METHOD_VERSIONS)
+        try:
+            cache_module.METHOD_VERSIONS['svf_contour'] += 1
+            self.assertNotEqual(SVFCache.make_key('svf_contour', self.azimuth, self.horizon, dip=10), key)
+        finally:
+            cache_module.METHOD_VERSIONS.clear()
+            cache_module.METHOD_VERSIONS.update(versions)
+
+    def test_unknown_method(self):
+        with SVFCache(self.path) as cache:
+            with self.assertRaises(ValueError):
+                cache.svf(self.azimuth, self.horizon, 'svf_unknown')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
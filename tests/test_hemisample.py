@@ -0,0 +1,98 @@
+import unittest
+
+import numpy as np
+
+from horizonpy.hemisample import (batches, cosine_hemisphere_sampler, cosine_pdf, cosine_sampler,
+                                  fibonacci_disk, hatbox_sampler, rejection_sampler,
+                                  skyview_stochastic)
+from horizonpy.horizon import Horizon
+from horizonpy.skyview import svf_helbig_2009
+
+
+class TestSamplers(unittest.TestCase):
+
+    def test_cosine_sampler(self):
+        x = cosine_sampler(200000, seed=0)
+        hist, edges = np.histogram(x, bins=10, range=(0, 1), density=True)
+        expected = np.diff(np.sin(np.pi * edges / 2)) / 0.1
+        np.testing.assert_allclose(hist, expected, atol=0.03)
+
+    def test_rejection_matches_inverse_cdf(self):
+        x = rejection_sampler(cosine_pdf, (0, 1), np.pi / 2, size=200000, seed=1)
+        y = cosine_sampler(200000, seed=2)
+        self.assertEqual(x.size, 200000)
+        np.testing.assert_allclose(np.percentile(x, [10, 50, 90]),
+                                   np.percentile(y, [10, 50, 90]), atol=0.01)
+
+    def test_rejection_low_acceptance(self):
+        p = lambda x: np.where(x < 0.01, 1, 0)
+        x = rejection_sampler(p, (0, 1), 1, size=1000, seed=0, block_size=10)
+        self.assertEqual(x.size, 1000)
+        self.assertTrue(np.all(x < 0.01))
+
+    def test_rejection_max_block(self):
+        blocks = []
+
+        def p(x):
+            blocks.append(x.size)
+            return np.where(x < 0.001, 1, 0)
+
+        x = rejection_sampler(p, (0, 1), 1, size=500, seed=0, block_size=100, max_block=5000)
+        self.assertEqual(x.size, 500)
+        self.assertLessEqual(max(blocks), 5000)
+
+    def test_seeded(self):
+        np.testing.assert_array_equal(hatbox_sampler(10, seed=4), hatbox_sampler(10, seed=4))
+        rng = np.random.default_rng(5)
+        self.assertFalse(np.array_equal(cosine_sampler(10, rng), cosine_sampler(10, rng)))
+
+    def test_hemisphere_samplers(self):
+        az, hor = hatbox_sampler(100000, seed=0)
+        self.assertTrue(np.all((hor >= 0) & (hor <= 90)))
+        # uniform on hemisphere: P(horizon > 30) = 1 - sin(30)
+        self.assertAlmostEqual(np.mean(hor > 30), 0.5, delta=0.01)
+
+        az, hor = cosine_hemisphere_sampler(100000, seed=0)
+        # cosine-weighted: P(horizon > 30) = 1 - cos(60)^2
+        self.assertAlmostEqual(np.mean(hor > 30), 0.75, delta=0.01)
+
+    def test_batches(self):
+        chunks = list(batches(cosine_sampler, 25, batch_size=10, seed=0))
+        self.assertEqual([c.size for c in chunks], [10, 10, 5])
+
+
+class TestStochasticSkyView(unittest.TestCase):
+
+    def setUp(self):
+        self.azimuth = np.arange(0, 360, 0.5)
+        self.horizon = 20 + 15 * np.sin(np.radians(3 * self.azimuth))
+
+    def test_fibonacci_disk(self):
+        az, r = fibonacci_disk(10000, (0.3, 0.7))
+        self.assertTrue(np.all((r >= 0) & (r <= 1)))
+        # cosine weighting: fraction of points inside r is r^2
+        self.assertAlmostEqual(np.mean(r < 0.5), 0.25, places=3)
+        self.assertAlmostEqual(np.mean(az < 90), 0.25, places=3)
+
+    def test_matches_helbig(self):
+        F, se = skyview_stochastic(self.azimuth, self.horizon, tol=1e-4, seed=0, return_error=True)
+        self.assertLessEqual(se, 1e-4)
+        expected = svf_helbig_2009(Horizon(self.azimuth, self.horizon), 0.05)
+        self.assertAlmostEqual(F, expected, delta=5e-4)
+
+    def test_obscured(self):
+        self.assertEqual(skyview_stochastic(self.azimuth, self.azimuth * 0 + 90, seed=0), 0)
+        self.assertEqual(skyview_stochastic(self.azimuth, self.azimuth * 0, seed=0), 1)
+
+    def test_max_n(self):
+        F, se = skyview_stochastic(self.azimuth, self.horizon, tol=1e-9, n=256, max_n=1024,
+                                   seed=0, return_error=True)
+        self.assertGreater(se, 1e-9)
+
+    def test_seeded(self):
+        self.assertEqual(skyview_stochastic(self.azimuth, self.horizon, seed=3),
+                         skyview_stochastic(self.azimuth, self.horizon, seed=3))
+
+
+if __name__ == '__main__':
+    unittest.main()
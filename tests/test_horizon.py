@@ -0,0 +1,56 @@
+import numpy as np
+import unittest
+
+from pandas import DataFrame
+
+from horizonpy.horizon import Horizon
+from horizonpy.skyview import SVF_discretized
+from horizonpy.arcsky import ArcSky
+
+
+class TestHorizon(unittest.TestCase):
+    def setUp(self):
+        self.azimuth = np.array([350., 10., 90., 180., 270.])
+        self.horizon = np.array([5., 15., 20., 30., 40.])
+        self.H = Horizon(self.azimuth, self.horizon)
+
+    def test_sorted(self):
+        np.testing.assert_array_equal(self.H.azimuth, [10, 90, 180, 270, 350])
+        np.testing.assert_array_equal(self.H.horizon, [15, 20, 30, 40, 5])
+
+    def test_periodic_interpolation(self):
+        np.testing.assert_allclose(self.H.horizon_at([0, 360, -10, 5]), [10, 10, 5, 12.5])
+
+    def test_readonly(self):
+        with self.assertRaises(ValueError):
+            self.H.horizon[0] = 1
+
+    def test_resample_cached(self):
+        phi, theta = self.H.resample(2)
+        self.assertIs(self.H.resample(2)[1], theta)
+        np.testing.assert_allclose(theta, self.H.horizon_at(phi))
+
+    def test_vectors(self):
+        np.testing.assert_allclose(np.linalg.norm(self.H.vectors, axis=0), 1)
+
+    def test_svf_discretized(self):
+        self.assertEqual(SVF_discretized(self.H, aspect=130, dip=35),
+                         SVF_discretized(self.azimuth, self.horizon, 130, 35))
+
+
+class TestArcSkyHorizon(unittest.TestCase):
+    def test_interpolate_dataframe(self):
+        AS = ArcSky()
+        AS.horizon = DataFrame([(270., 40.), (90., 20.)])
+        hr = AS.interpolate_horizon(90)
+        np.testing.assert_allclose(hr['horizon_ele_deg'], [30, 20, 30, 40])
+
+    def test_interpolate_horizon(self):
+        AS = ArcSky()
+        AS.horizon = Horizon([270, 90], [40, 20])
+        hr = AS.interpolate_horizon(90)
+        np.testing.assert_allclose(hr['azimuth_deg'], [0, 90, 180, 270])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from horizonpy.quickhorizon.ImagePyramid import ImagePyramid
+
+ZOOM = {0: 1.0, 1: 1.5, 2: 2.25, 3: 3.375}
+
+
+class TestImagePyramid(unittest.TestCase):
+
+    def setUp(self):
+        self.image = Image.new('RGB', (40, 30), (10, 20, 30))
+
+    def test_level_size(self):
+        P = ImagePyramid(self.image, ZOOM, background=False)
+        self.assertEqual(P.get(2).size, (90, 67))
+        self.assertIs(P.get(0), self.image)
+
+    def test_lookup_is_cached(self):
+        P = ImagePyramid(self.image, ZOOM, background=False)
+        self.assertIs(P.get(1), P.get(1))
+
+    def test_lru_bound(self):
+        P = ImagePyramid(self.image, ZOOM, max_levels=2, background=False)
+        P.get(1)
+        P.get(2)
+        P.get(1)
+        P.get(3)
+        self.assertEqual(len(P), 2)
+        self.assertIn(1, P)
+        self.assertNotIn(2, P)
+
+    def test_prefetch(self):
+        P = ImagePyramid(self.image, ZOOM)
+        P.get(0)
+        thread = P.prefetch([1, -1, 0])
+        thread.join()
+        self.assertIn(1, P)
+        self.assertIn(0, P)
+        self.assertIsNone(P.prefetch([1]))
+
+    def test_prefetch_unloaded_file(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        f = os.path.join(tmp, "image.png")
+        rng = np.random.default_rng(0)
+        Image.fromarray(rng.integers(0, 256, (300, 400, 3), dtype=np.uint8)).save(f)
+
+        with Image.open(f) as image:
+            P = ImagePyramid(image, ZOOM)
+            self.assertIsNone(image.fp)  # decoded and closed before any thread starts
+            threads = [P.prefetch([1, 2]), P.prefetch([3])]
+            view = P.view(1, (0, 0), (100, 100))
+            for thread in threads:
+                thread.join()
+
+            expected = image.resize(P.size(1), Image.LANCZOS)
+            self.assertTrue(np.array_equal(np.asarray(P.get(1)), np.asarray(expected)))
+            self.assertEqual(view.size, (100, 100))
+            self.assertIn(3, P)
+
+    def test_prefetch_disabled(self):
+        P = ImagePyramid(self.image, ZOOM, background=False)
+        self.assertIsNone(P.prefetch([1]))
+        self.assertEqual(len(P), 0)
+
+    def test_view_matches_full_resize(self):
+        rng = np.random.default_rng(0)
+        image = Image.fromarray(rng.integers(0, 256, (30, 40), dtype=np.uint8))
+        P = ImagePyramid(image, ZOOM, background=False)
+
+        region = P.view(2, (20, 10), (50, 40))
+        self.assertEqual(len(P), 0)  # only the region was resampled
+
+        expected = P.get(2).crop((20, 10, 70, 50))
+        diff = np.abs(np.asarray(region, dtype=float) - np.asarray(expected, dtype=float))
+        self.assertLessEqual(diff.max(), 1)
+        self.assertTrue(np.array_equal(np.asarray(P.view(2, (20, 10), (50, 40))),
+                                       np.asarray(expected)))
+
+    def test_view_outside_image(self):
+        P = ImagePyramid(self.image, ZOOM, background=False)
+        region = P.view(1, (-10, 40), (30, 20))
+        self.assertEqual(region.size, (30, 20))
+        self.assertEqual(region.getpixel((0, 0)), (0, 0, 0))
+        self.assertEqual(region.getpixel((15, 0)), (10, 20, 30))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import json
+import subprocess
+import sys
+import unittest
+
+SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import numpy
+t1 = time.perf_counter()
+import {module}
+t2 = time.perf_counter()
+print(json.dumps({{'numpy': t1 - t0, 'module': t2 - t1, 'modules': sorted(sys.modules)}}))
+"""
+
+HEAVY = ['matplotlib', 'shapely', 'scipy', 'pandas', 'pkg_resources', 'importlib.metadata']
+
+# seconds to import the module once numpy is loaded
+IMPORT_BUDGET = 0.25
+
+
+def import_in_subprocess(module):
+    output = subprocess.check_output([sys.executable, "-c", SCRIPT.format(module=module)],
+                                     universal_newlines=True)
+    return json.loads(output)
+
+
+class TestImport(unittest.TestCase):
+
+    def test_numeric_core(self):
+        for module in ['horizonpy', 'horizonpy.skyview', 'horizonpy.horizon',
+                       'horizonpy.hemisample', 'horizonpy.solar', 'horizonpy.svftable']:
+            result = import_in_subprocess(module)
+            loaded = [m for m in HEAVY if m in result['modules']]
+            self.assertEqual(loaded, [], "{} imports {}".format(module, loaded))
+            self.assertLess(result['module'], IMPORT_BUDGET, module)
+
+    def test_version(self):
+        import horizonpy
+        self.assertRegex(horizonpy.__version__, r"^\d+\.\d+")
+
+
+if __name__ == '__main__':
+    unittest.main()
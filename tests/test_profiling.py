@@ -0,0 +1,52 @@
+import json
+import unittest
+
+import numpy as np
+
+from horizonpy import profiling
+from horizonpy.skyview import SVF_discretized, svf_orientations
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.azimuth = np.arange(0, 360, 10)
+        self.horizon = self.azimuth * 0 + 30
+
+    def test_disabled(self):
+        self.assertFalse(profiling.enabled())
+        self.assertIs(profiling.stage('a'), profiling.stage('b'))
+
+    def test_svf_discretized_stages(self):
+        with profiling.profile() as P:
+            SVF_discretized(self.azimuth, self.horizon, 130, 35)
+            SVF_discretized(self.azimuth, self.horizon, 130, 35)
+
+        stats = P.stats()
+        for name in ['rotate', 'overhang', 'obscured', 'interpolate', 'integrate']:
+            self.assertEqual(stats['skyview.' + name]['calls'], 2)
+
+        self.assertEqual(stats['skyview.rotate']['size'], 2 * self.azimuth.size)
+        self.assertEqual(json.loads(P.to_json()), stats)
+        self.assertFalse(profiling.enabled())
+
+    def test_nested(self):
+        batch = profiling.Profile()
+        for _ in range(3):
+            with profiling.profile(batch), profiling.profile() as station:
+                svf_orientations(self.azimuth, self.horizon, [0, 90], [10, 10])
+            self.assertEqual(station.stats()['skyview.integrate']['calls'], 1)
+
+        self.assertEqual(batch.stats()['skyview.integrate']['calls'], 3)
+        self.assertGreaterEqual(batch.total(), station.total())
+
+    def test_timed(self):
+        f = profiling.timed('f')(lambda x: x + 1)
+        self.assertEqual(f(1), 2)
+        with profiling.profile() as P:
+            f(1)
+        self.assertEqual(P.stats()['f']['calls'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
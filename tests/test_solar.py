@@ -0,0 +1,87 @@
+import time
+import unittest
+
+import numpy as np
+
+from horizonpy.solar import HorizonTable, horizon_shading, sun_position
+
+
+class TestSunPosition(unittest.TestCase):
+
+    def test_noaa_reference(self):
+        # NOAA solar calculator, Boulder CO, 2020-06-21 19:00 UTC
+        az, el = sun_position(['2020-06-21T19:00'], 40.015, -105.27)
+        self.assertAlmostEqual(float(az[0]), 177.55, delta=0.05)
+        self.assertAlmostEqual(float(el[0]), 73.41, delta=0.05)
+
+    def test_interpolated_orbit(self):
+        t = np.arange('2021-01-01', '2021-03-01', 1, dtype='datetime64[m]')
+        az, el = sun_position(t, 62, -114)
+        az1, el1 = sun_position(t[::1001], 62, -114)
+        np.testing.assert_allclose(az[::1001], az1, atol=1e-4)
+        np.testing.assert_allclose(el[::1001], el1, atol=1e-4)
+
+    def test_timezone_aware(self):
+        import pandas as pd
+        t = pd.date_range('2020-06-21 12:00', periods=3, freq='h', tz='America/Edmonton')
+        az, el = sun_position(t, 53.5, -113.5)
+        az1, el1 = sun_position(t.tz_convert('UTC').tz_localize(None).values, 53.5, -113.5)
+        np.testing.assert_array_equal(el, el1)
+
+
+class TestHorizonShading(unittest.TestCase):
+
+    def setUp(self):
+        self.times = np.arange('2021-01-01', '2022-01-01', 1, dtype='datetime64[m]')
+        self.azimuth = np.arange(0, 360, 1.)
+        self.horizon = 20 + 10 * np.sin(np.radians(2 * self.azimuth))
+
+    def test_table(self):
+        T = HorizonTable(self.azimuth, self.horizon, 0.5)
+        q = np.random.default_rng(0).uniform(-360, 720, 1000)
+        np.testing.assert_allclose(T(q), np.interp(q, self.azimuth, self.horizon, period=360),
+                                   atol=0.01)
+
+    def test_flat_horizon(self):
+        shaded, cos_i = horizon_shading(self.times[::15], 45, -75, self.azimuth, self.azimuth * 0)
+        az, el = sun_position(self.times[::15], 45, -75)
+        np.testing.assert_array_equal(shaded, el <= 0)
+        np.testing.assert_allclose(cos_i, np.sin(np.radians(el)))
+
+    def test_tilted_incidence(self):
+        aspect, dip = 135, 30
+        shaded, cos_i = horizon_shading(self.times[::15], 45, -75, self.azimuth, self.horizon,
+                                        aspect, dip)
+        az, el = np.radians(sun_position(self.times[::15], 45, -75))
+        a, d = np.radians([aspect, dip])
+        expected = (np.cos(el) * np.sin(az) * np.sin(d) * np.sin(a) +
+                    np.cos(el) * np.cos(az) * np.sin(d) * np.cos(a) +
+                    np.sin(el) * np.cos(d))
+        np.testing.assert_allclose(cos_i, expected, atol=1e-12)
+        self.assertTrue(np.all(shaded[cos_i <= 0]))
+
+    def test_tilted_terrain_shading(self):
+        # steep walls except for gaps at azimuths 0-30 and 180-210
+        azimuth = np.arange(0, 360, 1.)
+        horizon = np.where((azimuth % 180) <= 30, 5, 70)
+        times = np.arange('2021-01-01T00:00', '2022-01-01T00:00', 60, dtype='datetime64[m]')
+        az, el = sun_position(times, 45, -75)
+        wall = (el > 0) & (el < 70) & ((az % 180) > 31) & ((az % 180) < 179)
+
+        for (aspect, dip) in [(135, 30), (0, 90)]:
+            shaded, cos_i = horizon_shading(times, 45, -75, azimuth, horizon, aspect, dip)
+            self.assertTrue(np.all(shaded[wall]))
+            np.testing.assert_array_equal(shaded, shaded | (cos_i <= 0))
+
+        shaded, _ = horizon_shading(np.array(['2021-06-01T10:00'], dtype='datetime64[m]'),
+                                    45, -75, azimuth, horizon, 135, 30)
+        self.assertTrue(shaded[0])
+
+    def test_year_of_minutes(self):
+        start = time.perf_counter()
+        horizon_shading(self.times, 45, -75, self.azimuth, self.horizon, 135, 30)
+        self.assertLess(time.perf_counter() - start, 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,10 @@ import numpy as np
 import unittest
 
 from horizonpy.skyview import svf_helbig_2009, svf_steyn_1980, SVF_discretized, rotate_horizon
+from horizonpy.skyview import svf_orientations, orientation_rotations, rotate_towards
+from horizonpy.skyview import svf_helbig_2009_stack, svf_contour, svf_steyn_1980_analytic
+from horizonpy.skyview import test_overhang as overhang, test_obscured as obscured
+from horizonpy.skyview import project_horizon_top_down
 
 from horizonpy.skyview import rotate_horizon
 
@@ -19,10 +23,206 @@ class TestSkyViewHelbig(unittest.TestCase):
         f = lambda x: x * 0 + 90
         self.assertEqual(svf_helbig_2009(f, 1), 0.0)
 
+
+class TestSkyViewHelbigStack(unittest.TestCase):
+    def test_matches_helbig(self):
+        rng = np.random.default_rng(42)
+        phi = np.arange(0, 360, 2)
+        horizons = rng.uniform(0, 120, (20, phi.size))
+        expected = [svf_helbig_2009(lambda x, h=h: np.interp(x, phi, h, period=360), 2)
+                    for h in horizons]
+        np.testing.assert_allclose(svf_helbig_2009_stack(horizons), expected)
+
+    def test_blocks(self):
+        horizons = np.random.default_rng(1).uniform(0, 100, (50, 36))
+        np.testing.assert_array_equal(svf_helbig_2009_stack(horizons),
+                                      svf_helbig_2009_stack(horizons, block_size=100))
+
+    def test_odd_bins(self):
+        with self.assertRaises(ValueError):
+            svf_helbig_2009_stack(np.zeros((2, 35)))
+
+
+class TestContourSkyView(unittest.TestCase):
+    def setUp(self):
+        self.azimuth = np.arange(0, 360, 0.5)
+        self.horizon = 20 + 10 * np.sin(np.radians(2 * self.azimuth))
+
+    def test_tilted_plane_flat_horizon(self):
+        azimuth = np.arange(0, 360, 10)
+        for dip in [0, 30, 90, 150, 180]:
+            expected = (1 + np.cos(np.radians(dip))) / 2
+            self.assertAlmostEqual(svf_contour(azimuth, azimuth * 0, 180, dip), expected, places=5)
+
+    def test_matches_helbig(self):
+        f = lambda x: np.interp(x, self.azimuth, self.horizon, period=360)
+        self.assertAlmostEqual(svf_contour(self.azimuth, self.horizon),
+                               svf_helbig_2009(f, 0.5), places=4)
+
+    def test_direction_independent(self):
+        self.assertEqual(svf_contour(self.azimuth, self.horizon, 130, 35),
+                         svf_contour(self.azimuth[::-1], self.horizon[::-1], 130, 35))
+
+    def test_horizon_below_plane(self):
+        azimuth = np.arange(0, 360, 1.)
+        F = svf_contour(azimuth, azimuth * 0 - 10, 0, 180)
+        self.assertAlmostEqual(F, np.sin(np.radians(10)) ** 2, places=4)
+
+    def test_overhanging_zenith(self):
+        import os
+        from horizonpy.svfbatch import read_horizon_file
+        f = os.path.join(os.path.dirname(__file__), "..", "SampleHorizonImages", "Horizon_1.hpt.csv")
+        azimuth, horizon = read_horizon_file(f)
+        self.assertAlmostEqual(svf_contour(azimuth, horizon),
+                               svf_steyn_1980_analytic(azimuth, horizon, 72), places=2)
+
+    def test_sample_horizons_steep_dips(self):
+        import os
+        from horizonpy.svfbatch import read_horizon_file
+        for name in ["Horizon_1.hpt.csv", "Horizon_3.hpt.csv"]:
+            f = os.path.join(os.path.dirname(__file__), "..", "SampleHorizonImages", name)
+            azimuth, horizon = read_horizon_file(f)
+            dip = np.arange(60, 181, 2)
+            for aspect in range(0, 360, 15):
+                F = np.array([svf_contour(azimuth, horizon, aspect, d) for d in dip])
+                self.assertTrue(np.all((F >= 0) & (F <= 1)), (name, aspect))
+                self.assertLess(np.max(np.abs(np.diff(F))), 0.05, (name, aspect))
+
+    def test_matches_discretized(self):
+        F = svf_contour(self.azimuth, self.horizon, 130, 35)
+        self.assertAlmostEqual(F, SVF_discretized(self.azimuth.copy(), self.horizon.copy(), 130, 35, 1), places=4)
+
+
+class TestSkyViewSteynAnalytic(unittest.TestCase):
+    def test_matches_shapely(self):
+        azimuth = np.arange(0, 360, 2.)
+        horizon = 20 + 10 * np.sin(np.radians(2 * azimuth))
+        for n in [18, 36, 72]:
+            self.assertAlmostEqual(svf_steyn_1980_analytic(azimuth, horizon, n),
+                                   svf_steyn_1980(azimuth, horizon, n), delta=2e-3)
+
+    def test_rotated_horizon(self):
+        azimuth = np.arange(0, 360, 10.)
+        horizon = azimuth * 0 + 50
+        rt = rotate_horizon(azimuth, horizon, 130, 80, oob="ignore")
+        F = svf_steyn_1980_analytic(rt[0], rt[1], 72)
+        self.assertTrue(0 <= F <= 1)
+
+
+class TestOverhang(unittest.TestCase):
+    @staticmethod
+    def shapely_overhang(theta, horiz):
+        from shapely.geometry import LineString, LinearRing, Point
+        xp = np.cos(np.radians(horiz)) * np.cos(np.radians(90 - theta))
+        yp = np.cos(np.radians(horiz)) * np.sin(np.radians(90 - theta))
+        L = LinearRing(np.column_stack((xp, yp)))
+        O = Point(0, 0)
+        ohang = []
+        for (x, y) in zip(xp, yp):
+            d = np.hypot(x, y)
+            pts = LineString([[0, 0], [x * 2 / d, y * 2 / d]]).intersection(L)
+            pts = list(getattr(pts, 'geoms', [pts]))
+            ohang.append(len(pts) > 1 and max(O.distance(p) for p in pts) > d + 1e-9)
+        return np.array(ohang)
+
+    def test_matches_shapely(self):
+        azimuth = np.arange(0, 360, 10.)
+        horizon = azimuth * 0 + 50
+        for (aspect, dip) in [(120, 70), (120, 120), (0, 10), (45, 100)]:
+            rt = rotate_horizon(azimuth, horizon, aspect, dip, oob="ignore")
+            np.testing.assert_array_equal(overhang(rt[0], rt[1]),
+                                          self.shapely_overhang(rt[0], rt[1]))
+
+    def test_counts(self):
+        azimuth = np.arange(0, 360, 10.)
+        ohang, counts = overhang(azimuth, azimuth * 0 + 30, return_counts=True)
+        self.assertFalse(ohang.any())
+        np.testing.assert_array_equal(counts, 1)
+
+
+class TestObscured(unittest.TestCase):
+    @staticmethod
+    def shapely_obscured(theta, horiz, increment):
+        from shapely.geometry import LineString, LinearRing
+        xp, yp = project_horizon_top_down(theta, horiz)
+        L = LinearRing(np.column_stack((xp, yp)))
+        obscured_points = []
+        for angle in range(0, 180, increment):
+            x = 2 * np.cos(np.radians(90 - angle))
+            y = 2 * np.sin(np.radians(90 - angle))
+            if LineString([[x, y], [-x, -y]]).intersection(L).is_empty:
+                obscured_points += [angle, (180 + angle) % 360]
+        return np.array(obscured_points)
+
+    def test_matches_shapely(self):
+        azimuth = np.arange(0, 360, 10.)
+        for (horizon, aspect, dip) in [(70, 120, 120), (50, 120, 50), (30, 0, 0), (80, 10, 150)]:
+            rt = rotate_horizon(azimuth, azimuth * 0 + horizon, aspect, dip)
+            np.testing.assert_array_equal(obscured(rt[0], rt[1], 5),
+                                          self.shapely_obscured(rt[0], rt[1], 5))
+
+    def test_fractional_increment(self):
+        azimuth = np.arange(0, 360, 10.)
+        rt = rotate_horizon(azimuth, azimuth * 0 + 70, 120, 120)
+        obs = obscured(rt[0], rt[1], 0.5)
+        np.testing.assert_array_equal(obs[1::2], (obs[::2] + 180) % 360)
+        self.assertTrue(set(obscured(rt[0], rt[1], 5)) <= set(obs))
+
+
 class TestDiscretizedSkyView(unittest.TestCase):
     pass
 
 
+class TestOrientationSkyView(unittest.TestCase):
+    def setUp(self):
+        self.azimuth = np.arange(0, 360, 10.)
+        self.horizon = 20 + 10 * np.sin(np.radians(2 * self.azimuth))
+        self.orientations = [(130, 35), (0, 0), (90, 10), (200, 20), (45, 40)]
+
+    def test_matches_discretized(self):
+        aspect, dip = zip(*self.orientations)
+        F = svf_orientations(self.azimuth, self.horizon, aspect, dip)
+        expected = [SVF_discretized(self.azimuth.copy(), self.horizon.copy(), a, d, 2)
+                    for (a, d) in self.orientations]
+        np.testing.assert_allclose(F, expected, atol=5e-3)
+
+    def test_matches_contour(self):
+        import os
+        from horizonpy.svfbatch import read_horizon_file
+        azimuth = np.arange(0, 360, 2.)
+        canyon = np.where((azimuth % 180 > 60) & (azimuth % 180 < 120), 70., 10.)
+        horizons = [(self.azimuth, self.horizon), (azimuth, canyon)]
+        for name in ["Horizon_1.hpt.csv", "Horizon_3.hpt.csv"]:
+            f = os.path.join(os.path.dirname(__file__), "..", "SampleHorizonImages", name)
+            horizons.append(read_horizon_file(f))
+
+        aspect, dip = np.meshgrid(np.arange(0, 360, 30.), np.arange(0, 181, 15.))
+        for (az, hor) in horizons:
+            F = svf_orientations(az, hor, aspect.ravel(), dip.ravel())
+            expected = [svf_contour(az, hor, a, d) for (a, d) in zip(aspect.ravel(), dip.ravel())]
+            np.testing.assert_array_equal(F, expected)
+            self.assertTrue(np.all((F >= 0) & (F <= 1)))
+
+    def test_steep_planes(self):
+        azimuth = np.arange(0, 360, 1.)
+        F = svf_orientations(azimuth, azimuth * 0 + 30, [0, 0, 90], [80, 90, 90])
+        self.assertAlmostEqual(F[1], 0.195, delta=2e-3)
+        self.assertAlmostEqual(F[1], F[2])
+        self.assertLess(F[0], 0.3)
+
+    def test_blocks(self):
+        aspect = np.arange(0, 360, 10.)
+        F = svf_orientations(self.azimuth, self.horizon, aspect, aspect / 2)
+        np.testing.assert_array_equal(F, svf_orientations(self.azimuth, self.horizon, aspect,
+                                                          aspect / 2, block_size=50))
+
+    def test_rotations_cached(self):
+        R1 = orientation_rotations([135, 135], [30, 30])
+        R2 = orientation_rotations(135, 30)
+        np.testing.assert_allclose(R1[0], rotate_towards(135, -30))
+        np.testing.assert_array_equal(R1[1], R2[0])
+
+
 class TestRotation(unittest.TestCase):
 
     def rotated_horizons_positive(self):
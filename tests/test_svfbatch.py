@@ -0,0 +1,80 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from pandas import read_csv
+
+from horizonpy import svfbatch
+
+SAMPLES = os.path.join(os.path.dirname(__file__), "..", "SampleHorizonImages")
+
+
+class TestSVFBatch(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.out = os.path.join(self.dir, "svf.csv")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def run_main(self, *args):
+        with mock.patch.object(sys, 'argv', ['svfbatch'] + list(args)):
+            svfbatch.main()
+
+    def test_find_files(self):
+        files = svfbatch.find_horizon_files([SAMPLES])
+        self.assertEqual([svfbatch.station_name(f) for f in files],
+                         ['Horizon_1', 'Horizon_2', 'Horizon_3'])
+
+    def test_parallel_matches_serial(self):
+        serial = os.path.join(self.dir, "serial.csv")
+        self.run_main(SAMPLES, '--out', serial, '--jobs', '1', '--orientation', '180,30')
+        self.run_main(SAMPLES, '--out', self.out, '--jobs', '2', '--chunk-size', '1',
+                      '--orientation', '180,30')
+
+        expected = read_csv(serial).sort_values('station').reset_index(drop=True)
+        result = read_csv(self.out).sort_values('station').reset_index(drop=True)
+        self.assertEqual(len(result), 3)
+        self.assertTrue(expected.equals(result))
+
+    def test_resume(self):
+        shutil.copy(os.path.join(SAMPLES, "Horizon_1.hpt.csv"), self.dir)
+        self.run_main(self.dir, '--out', self.out, '--jobs', '1')
+        shutil.copy(os.path.join(SAMPLES, "Horizon_2.hpt.csv"), self.dir)
+        self.run_main(self.dir, '--out', self.out, '--jobs', '1', '--resume')
+
+        result = read_csv(self.out)
+        self.assertEqual(list(result['station']), ['Horizon_1', 'Horizon_2'])
+
+    def test_duplicate_stations(self):
+        other = os.path.join(self.dir, "other")
+        os.mkdir(other)
+        shutil.copy(os.path.join(SAMPLES, "Horizon_1.hpt.csv"), other)
+
+        with self.assertRaises(SystemExit):
+            self.run_main(SAMPLES, other, '--out', self.out, '--jobs', '1')
+        self.assertFalse(os.path.isfile(self.out))
+
+    def test_helbig_rejects_tilted(self):
+        with self.assertRaises(SystemExit):
+            self.run_main(SAMPLES, '--out', self.out, '--jobs', '1', '--method', 'helbig',
+                          '--orientation', '0,0', '--orientation', '180,30')
+        self.assertFalse(os.path.isfile(self.out))
+
+        self.run_main(SAMPLES, '--out', self.out, '--jobs', '1', '--method', 'helbig')
+        self.assertEqual(len(read_csv(self.out)), 3)
+
+    def test_bad_file_skipped(self):
+        with open(os.path.join(self.dir, "bad.hpt.csv"), 'w') as f:
+            f.write("not,a,horizon\n")
+        shutil.copy(os.path.join(SAMPLES, "Horizon_2.hpt.csv"), self.dir)
+        self.run_main(self.dir, '--out', self.out, '--jobs', '1')
+
+        self.assertEqual(list(read_csv(self.out)['station']), ['Horizon_2'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from horizonpy.skyview import svf_contour
+from horizonpy.svftable import SVFTable
+
+
+class TestSVFTable(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.azimuth = np.arange(0, 360, 2.)
+        cls.horizon = 20 + 10 * np.sin(np.radians(2 * cls.azimuth))
+        cls.table = SVFTable.compute(cls.azimuth, cls.horizon, d_aspect=15, d_dip=10, jobs=1)
+
+    def test_grid_nodes(self):
+        self.assertAlmostEqual(float(self.table(30, 40)),
+                               svf_contour(self.azimuth, self.horizon, 30, 40), places=6)
+
+    def test_error_bound(self):
+        rng = np.random.default_rng(0)
+        aspect = rng.uniform(0, 360, 50)
+        dip = rng.uniform(0, 90, 50)
+        F, error = self.table(aspect, dip, return_error=True)
+        exact = [svf_contour(self.azimuth, self.horizon, a, d) for (a, d) in zip(aspect, dip)]
+        self.assertGreaterEqual(np.mean(np.abs(F - exact) <= error), 0.95)
+
+    def test_periodic_aspect(self):
+        self.assertAlmostEqual(float(self.table(359.9, 30)), float(self.table(-0.1, 30)))
+        self.assertAlmostEqual(float(self.table(359.9, 30)), float(self.table(0, 30)), places=3)
+
+    def test_dip_out_of_range(self):
+        with self.assertRaises(ValueError):
+            self.table(0, 95)
+
+    def test_parallel(self):
+        kwargs = dict(d_aspect=90, d_dip=30)
+        np.testing.assert_array_equal(SVFTable.compute(self.azimuth, self.horizon, jobs=2, **kwargs).svf,
+                                      SVFTable.compute(self.azimuth, self.horizon, jobs=1, **kwargs).svf)
+
+    def test_optimize(self):
+        aspect, dip, F = self.table.optimize('max')
+        self.assertEqual(dip, 0)
+        self.assertAlmostEqual(F, float(self.table.svf.max()))
+
+        f = lambda a, d: svf_contour(self.azimuth, self.horizon, a, d)
+        a0, d0, F0 = self.table.optimize('min')
+        a1, d1, F1 = self.table.optimize('min', refine=f)
+        self.assertLessEqual(F1, F0)
+        self.assertAlmostEqual(F1, f(a1, d1), places=5)
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "table.npz")
+            self.table.save(path)
+            T = SVFTable.load(path)
+        np.testing.assert_array_equal(T.svf, self.table.svf)
+        self.assertEqual(T.svf.dtype, np.float32)
+
+
+if __name__ == '__main__':
+    unittest.main()